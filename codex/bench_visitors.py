@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Benchmark POST /api/visitors throughput and latency per durability mode.
+
+For every mode a fresh visitor store is served from a scratch directory on a
+local port and hammered by concurrent clients posting app.js-shaped records.
+Throughput and p50/p99/max latency are printed and written as JSON. A cold
+read case then fills a log with --cold-records records and times the first
+GET /api/visitors?limit=50 of a freshly started store, with and without the
+summary file it keeps next to the log:
+
+    python codex/bench_visitors.py
+    python codex/bench_visitors.py --requests 5000 --concurrency 32 --modes group-commit,always
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import platform
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import server
+
+
+DEFAULT_OUTPUT = server.REPO_ROOT / ".build-cache" / "bench" / "visitors.json"
+
+
+class BenchServer(server.ThreadingHTTPServer):
+    # The default backlog of 5 makes concurrent clients stall on SYN retries.
+    request_queue_size = 256
+    daemon_threads = True
+
+
+class QuietHandler(server.CodexHandler):
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        pass
+
+
+def sample_record(client: int, sequence: int) -> bytes:
+    record = {
+        "id": f"bench-{client}-{sequence}",
+        "recordedAt": datetime.now(timezone.utc).isoformat(),
+        "page": f"/guides/sql-guide/{sequence % 24:02d}_Chapter.html",
+        "reason": "page-view",
+        "referrer": "",
+        "ip": f"192.0.2.{client % 250}",
+        "location": "Unknown",
+        "browser": "Firefox 131",
+        "userAgent": "Mozilla/5.0 (X11; Linux x86_64; rv:131.0) Gecko/20100101 Firefox/131.0",
+        "os": "Linux",
+        "device": "Desktop",
+        "language": "en-US",
+        "timezone": "Europe/Berlin",
+        "viewport": "1280x720",
+        "screen": "1920x1080",
+        "fingerprint": f"192.0.2.{client % 250}|Firefox 131|Linux|Europe/Berlin",
+    }
+    return json.dumps(record).encode("utf-8")
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def bench_mode(mode: str, requests: int, concurrency: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix="visitor-bench-") as scratch:
+        server.DATA_DIR = Path(scratch)
+        server.DATA_FILE = server.DATA_DIR / "visitors.jsonl"
+        server.STORE = server.VisitorStore(mode)
+        # Measure the store, not the admission limits.
+        server.INGEST = server.IngestLimits(rate=0, max_pending=concurrency, ip_rate=0)
+
+        httpd = BenchServer(("127.0.0.1", 0), QuietHandler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        port = httpd.server_address[1]
+
+        latencies: list[float] = []
+        errors = 0
+        lock = threading.Lock()
+
+        def client(index: int) -> None:
+            nonlocal errors
+            own: list[float] = []
+            failed = 0
+            for sequence in range(index, requests, concurrency):
+                body = sample_record(index, sequence)
+                started = time.perf_counter()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                try:
+                    connection.request("POST", "/api/visitors", body, {"Content-Type": "application/json"})
+                    response = connection.getresponse()
+                    response.read()
+                    failed += response.status != 201
+                except OSError:
+                    failed += 1
+                finally:
+                    connection.close()
+                own.append(time.perf_counter() - started)
+            with lock:
+                latencies.extend(own)
+                errors += failed
+
+        started = time.perf_counter()
+        clients = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        httpd.shutdown()
+        httpd.server_close()
+
+    return {
+        "mode": mode,
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "requests_per_second": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(max(latencies, default=0.0) * 1000, 3),
+    }
+
+
+def bench_cold_read(records: int, limit: int = 50) -> dict:
+    with tempfile.TemporaryDirectory(prefix="visitor-bench-") as scratch:
+        server.DATA_DIR = Path(scratch)
+        server.DATA_FILE = server.DATA_DIR / "visitors.jsonl"
+        store = server.VisitorStore("none")
+        for sequence in range(records):
+            record = json.loads(sample_record(sequence % 997, sequence))
+            record["serverRecordedAt"] = datetime.now(timezone.utc).isoformat()
+            store.append(record)
+        store.save_summary()
+
+        def first_read() -> float:
+            started = time.perf_counter()
+            server.VisitorStore("none").response(limit)
+            return time.perf_counter() - started
+
+        with_summary = first_read()
+        server.summary_path().unlink()
+        without_summary = first_read()
+        log_bytes = server.DATA_FILE.stat().st_size
+
+    return {
+        "records": records,
+        "log_bytes": log_bytes,
+        "limit": limit,
+        "summary_ms": round(with_summary * 1000, 3),
+        "rescan_ms": round(without_summary * 1000, 3),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark visitor POST throughput per durability mode.")
+    parser.add_argument(
+        "--modes",
+        default=",".join(server.DURABILITY_MODES),
+        help=f"Comma-separated durability modes (default: {','.join(server.DURABILITY_MODES)})",
+    )
+    parser.add_argument("--requests", type=int, default=2000, help="POSTs per mode (default: 2000)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients (default: 16)")
+    parser.add_argument(
+        "--cold-records",
+        type=int,
+        default=20_000,
+        help="Records in the log for the cold read case, 0 = skip it (default: 20000)",
+    )
+    parser.add_argument(
+        "--output", type=Path, default=DEFAULT_OUTPUT, help=f"Results JSON path (default: {DEFAULT_OUTPUT})"
+    )
+    args = parser.parse_args(argv)
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = sorted(set(modes) - set(server.DURABILITY_MODES))
+    if unknown:
+        raise SystemExit(f"Unknown durability mode(s): {', '.join(unknown)}")
+
+    results = []
+    for mode in modes:
+        result = bench_mode(mode, args.requests, args.concurrency)
+        results.append(result)
+        print(
+            f"{mode:<13} {result['requests_per_second']:9.1f} req/s  p50 {result['p50_ms']:8.2f} ms  "
+            f"p99 {result['p99_ms']:8.2f} ms  max {result['max_ms']:8.2f} ms  errors {result['errors']}"
+        )
+
+    cold_read = bench_cold_read(args.cold_records) if args.cold_records > 0 else None
+    if cold_read:
+        print(
+            f"cold read     {cold_read['log_bytes']:9d} B log   first GET {cold_read['summary_ms']:8.2f} ms "
+            f"with summary, {cold_read['rescan_ms']:8.2f} ms rescanning"
+        )
+
+    payload = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "results": results,
+        "cold_read": cold_read,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
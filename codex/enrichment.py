@@ -0,0 +1,176 @@
+"""
+Server-side enrichment of posted visitor records.
+
+The Codex server fills in what the browser would otherwise have to look up
+itself before posting:
+- ip: the address of the connecting socket
+- browser/os/device: parsed from the User-Agent header with the same rules
+  as codex/js/app.js, memoized per distinct User-Agent string
+- location/coords: looked up in a local GeoIP range table
+
+The GeoIP table is a CSV at codex/data/geoip.csv in the layout of DB-IP's
+free "IP to City Lite" download (ip_start,ip_end,continent,country,
+stateprov,city,latitude,longitude); the three-column "IP to Country Lite"
+layout (ip_start,ip_end,country) works too. The shipped table only names the
+loopback and private ranges; drop a full download in its place for real
+locations. Ranges are kept in sorted arrays per IP version and searched with
+bisect, and the table is reloaded when the file changes.
+"""
+
+from __future__ import annotations
+
+import csv
+import ipaddress
+import re
+import threading
+from bisect import bisect_right
+from functools import lru_cache
+from pathlib import Path
+
+
+GEOIP_FILE = Path(__file__).resolve().parent / "data" / "geoip.csv"
+UA_CACHE_SIZE = 1024
+PLACEHOLDERS = {"", "unknown", "unavailable", "loading…", "waiting…"}
+
+BROWSER_RULES = (
+    ("Edge", re.compile(r"Edg/")),
+    ("Opera", re.compile(r"OPR/")),
+    ("Chrome", re.compile(r"Chrome/")),
+    ("Firefox", re.compile(r"Firefox/")),
+    ("Safari", re.compile(r"Safari/")),
+)
+OS_RULES = (
+    ("Windows", re.compile(r"Windows NT")),
+    ("iOS", re.compile(r"iPhone|iPad|iPod")),
+    ("macOS", re.compile(r"Mac OS X")),
+    ("Android", re.compile(r"Android")),
+    ("Linux", re.compile(r"Linux")),
+)
+TABLET_RE = re.compile(r"iPad|Tablet")
+MOBILE_RE = re.compile(r"Mobi|Android")
+
+
+@lru_cache(maxsize=UA_CACHE_SIZE)
+def parse_user_agent(user_agent: str) -> tuple[str, str, str]:
+    """Return (browser, os, device) for a User-Agent string."""
+    # First match wins, so Edge and Opera (which also say Chrome/ and
+    # Safari/) come before Chrome, and iOS (which says Mac OS X) before macOS.
+    browser = next((name for name, pattern in BROWSER_RULES if pattern.search(user_agent)), "Unknown")
+    os_name = next((name for name, pattern in OS_RULES if pattern.search(user_agent)), "Unknown")
+    if TABLET_RE.search(user_agent):
+        device = "Tablet"
+    elif MOBILE_RE.search(user_agent):
+        device = "Mobile"
+    else:
+        device = "Desktop"
+    return browser, os_name, device
+
+
+def client_ip(address: str) -> str:
+    try:
+        ip = ipaddress.ip_address(address.split("%", 1)[0])
+    except ValueError:
+        return address
+    mapped = getattr(ip, "ipv4_mapped", None)
+    return str(mapped or ip)
+
+
+class GeoIPTable:
+    """Sorted, non-overlapping IP ranges mapped to (location, coords)."""
+
+    def __init__(self, path: Path = GEOIP_FILE) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self._stamp: tuple[int, int] | None = None
+        self._starts: dict[int, list[int]] = {4: [], 6: []}
+        self._ends: dict[int, list[int]] = {4: [], 6: []}
+        self._values: dict[int, list[tuple[str, str]]] = {4: [], 6: []}
+
+    def _load(self) -> None:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            stat = None
+        stamp = (stat.st_mtime_ns, stat.st_size) if stat else (0, 0)
+        if stamp == self._stamp:
+            return
+
+        ranges: dict[int, list[tuple[int, int, tuple[str, str]]]] = {4: [], 6: []}
+        if stat:
+            with self.path.open("r", encoding="utf-8", newline="") as handle:
+                for row in csv.reader(handle):
+                    entry = parse_range(row)
+                    if entry:
+                        version, start, end, value = entry
+                        ranges[version].append((start, end, value))
+        for version, entries in ranges.items():
+            entries.sort()
+            self._starts[version] = [start for start, _, _ in entries]
+            self._ends[version] = [end for _, end, _ in entries]
+            self._values[version] = [value for _, _, value in entries]
+        self._stamp = stamp
+
+    def lookup(self, address: str) -> tuple[str, str] | None:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return None
+        number = int(ip)
+        with self.lock:
+            self._load()
+            starts = self._starts[ip.version]
+            index = bisect_right(starts, number) - 1
+            if index < 0 or number > self._ends[ip.version][index]:
+                return None
+            return self._values[ip.version][index]
+
+
+def parse_range(row: list[str]) -> tuple[int, int, int, tuple[str, str]] | None:
+    if len(row) < 3 or row[0].startswith("#"):
+        return None
+    try:
+        start, end = ipaddress.ip_address(row[0].strip()), ipaddress.ip_address(row[1].strip())
+    except ValueError:
+        return None
+    if start.version != end.version:
+        return None
+    if len(row) >= 6:
+        country, region, city = row[3], row[4], row[5]
+    else:
+        country, region, city = row[2], "", ""
+    location = ", ".join(part.strip() for part in (city, region, country) if part.strip())
+    coords = ""
+    if len(row) >= 8 and row[6].strip() and row[7].strip():
+        coords = f"{row[6].strip()}, {row[7].strip()} (ip approx)"
+    return start.version, int(start), int(end), (location or "unknown", coords)
+
+
+GEOIP = GeoIPTable()
+
+
+def enrich_record(record: dict, address: str, user_agent: str) -> dict:
+    """Return record with ip, browser, os, device, location and fingerprint filled in by the server."""
+    user_agent = user_agent or str(record.get("userAgent") or "")
+    ip = client_ip(address)
+    browser, os_name, device = parse_user_agent(user_agent)
+    enriched = {
+        **record,
+        "ip": ip,
+        "userAgent": user_agent or "unknown",
+        "browser": browser,
+        "os": os_name,
+        "device": device,
+    }
+
+    found = GEOIP.lookup(ip)
+    if found:
+        enriched["location"] = found[0]
+    elif str(record.get("location", "")).strip() in PLACEHOLDERS:
+        enriched["location"] = "unknown"
+    # Coordinates from the browser's geolocation API beat the range table.
+    if found and found[1] and str(record.get("coords", "")).strip() in PLACEHOLDERS:
+        enriched["coords"] = found[1]
+
+    timezone = str(record.get("timezone") or "unknown")
+    enriched["fingerprint"] = f"{ip}|{browser}|{os_name}|{timezone}|{user_agent}"
+    return enriched
@@ -269,15 +269,22 @@
       }
     };
 
+    // Set from Retry-After when the server rate limits (429) or sheds load (503).
+    let remoteRetryAt = 0;
+
     const writeVisitorLogRemote = async (record) => {
-      if (window.location.protocol === 'file:') return;
+      if (window.location.protocol === 'file:' || Date.now() < remoteRetryAt) return;
       try {
-        await fetch(visitorApiUrl, {
+        const res = await fetch(visitorApiUrl, {
           method: 'POST',
           headers: { 'Content-Type': 'application/json' },
           body: JSON.stringify(record),
           keepalive: true
         });
+        if (res.status === 429 || res.status === 503) {
+          const seconds = Number(res.headers.get('Retry-After')) || 1;
+          remoteRetryAt = Date.now() + seconds * 1000;
+        }
       } catch {
         // API may be unavailable (e.g. static hosting); localStorage remains fallback.
       }
@@ -289,14 +296,16 @@
       return text || fallback;
     };
 
-    const storeVisitorRecord = (reason) => {
+    // Reads the panel as it is now; pass the record already posted for this
+    // visit to keep its id and time.
+    const buildVisitorRecord = (reason, posted = null) => {
       const timezone = Intl.DateTimeFormat().resolvedOptions().timeZone || 'unknown';
       const ip = valueFrom(visitorIpEl);
       const browser = detectBrowser();
       const os = detectOS();
-      const record = {
-        id: `${Date.now()}-${Math.random().toString(36).slice(2, 8)}`,
-        recordedAt: new Date().toISOString(),
+      return {
+        id: posted ? posted.id : `${Date.now()}-${Math.random().toString(36).slice(2, 8)}`,
+        recordedAt: posted ? posted.recordedAt : new Date().toISOString(),
         page: window.location.pathname || 'unknown',
         reason: reason || 'auto',
         referrer: doc.referrer || 'direct',
@@ -314,13 +323,20 @@
         network: valueFrom(visitorNetworkEl),
         fingerprint: `${ip}|${browser}|${os}|${timezone}|${ua}`
       };
+    };
 
+    const saveVisitorRecordLocal = (record) => {
       const next = readVisitorLog();
       next.push(record);
       if (next.length > visitorLogLimit) {
         next.splice(0, next.length - visitorLogLimit);
       }
       writeVisitorLog(next);
+    };
+
+    const storeVisitorRecord = (reason) => {
+      const record = buildVisitorRecord(reason);
+      saveVisitorRecordLocal(record);
       void writeVisitorLogRemote(record);
     };
 
@@ -337,6 +353,11 @@
     };
 
     const loadPublicIpAndGeo = async (reason = 'initial') => {
+      // The server fills in ip, location, browser, os and device from the
+      // request itself, so the record goes out now. localStorage is the only
+      // log on static hosting, so the local copy waits for the lookups below.
+      const posted = buildVisitorRecord(reason);
+      void writeVisitorLogRemote(posted);
       visitorIpEl.textContent = 'loading…';
       if (visitorLocationEl) visitorLocationEl.textContent = 'loading…';
 
@@ -364,8 +385,7 @@
           visitorCoordsEl.textContent = 'unavailable';
         }
       }
-
-      storeVisitorRecord(reason);
+      saveVisitorRecordLocal(buildVisitorRecord(reason, posted));
     };
 
     if (visitorBrowserEl) visitorBrowserEl.textContent = detectBrowser();
@@ -8,6 +8,9 @@
 
   let pages = [];
   let selectedKind = 'all';
+  let searchIndex = null;
+  let searchSeq = 0;
+  const shardCache = new Map();
 
   function normalizePath(rawPath) {
     if (!rawPath || rawPath === '/') return '/index.html';
@@ -40,6 +43,114 @@
     return 'other';
   }
 
+  function loadSearchIndex() {
+    if (!searchIndex) {
+      searchIndex = fetch('mirror/search/index.json')
+        .then((response) => {
+          if (!response.ok) throw new Error(`HTTP ${response.status}`);
+          return response.json();
+        })
+        .then((index) => ({
+          ...index,
+          stopwords: new Set(index.stopwords),
+          keywords: new Set(index.keywords),
+          phrases: new Set(index.phrases),
+          shards: new Set(index.shards)
+        }))
+        .catch(() => null);
+    }
+    return searchIndex;
+  }
+
+  function loadShard(key) {
+    if (!shardCache.has(key)) {
+      shardCache.set(key, fetch(`mirror/search/terms-${key}.json`)
+        .then((response) => (response.ok ? response.json() : {}))
+        .catch(() => ({})));
+    }
+    return shardCache.get(key);
+  }
+
+  // Mirrors stem()/tokenize() in scripts/search_index.py so query terms
+  // match the terms the build wrote into the index shards.
+  function stem(term, index) {
+    if (index.keywords.has(term) || term.length <= 3 || !/^[a-z]+$/.test(term)) return term;
+    const suffixes = [['ies', 'y'], ['sses', 'ss'], ['s', ''], ['ing', ''], ['ed', '']];
+    for (const [suffix, replacement] of suffixes) {
+      if (!term.endsWith(suffix) || term.length - suffix.length < 3) continue;
+      if (suffix === 's' && /(ss|us|is)$/.test(term)) continue;
+      term = term.slice(0, -suffix.length) + replacement;
+      if (index.keywords.has(term)) return term;
+    }
+    if (term.endsWith('e') && term.length > 4) term = term.slice(0, -1);
+    return term;
+  }
+
+  function tokenize(text, index) {
+    const words = text.toLowerCase().match(/[a-z0-9][a-z0-9_$#]*/g) || [];
+    const terms = [];
+    words.forEach((word, idx) => {
+      if (idx > 0 && index.phrases.has(`${words[idx - 1]} ${word}`)) {
+        terms.push(`${words[idx - 1]} ${word}`);
+      }
+      if (index.keywords.has(word)) {
+        terms.push(word);
+        return;
+      }
+      if (index.stopwords.has(word)) return;
+      terms.push(stem(word, index));
+    });
+    return Array.from(new Set(terms));
+  }
+
+  function shardKey(term) {
+    const first = term.charAt(0);
+    return first >= 'a' && first <= 'z' ? first : '0';
+  }
+
+  async function searchContent(query) {
+    const index = await loadSearchIndex();
+    if (!index) return new Map();
+
+    const terms = tokenize(query, index);
+    // Every term has to match, so one without a shard rules out every page.
+    if (!terms.length || !terms.every((term) => index.shards.has(shardKey(term)))) return new Map();
+
+    const shards = await Promise.all(terms.map((term) => loadShard(shardKey(term))));
+    const docScores = new Map();
+    const totalSections = index.sections.length;
+
+    terms.forEach((term, termIdx) => {
+      const postings = shards[termIdx][term] || [];
+      const idf = Math.log(1 + totalSections / Math.max(1, postings.length / 2));
+      const seenDocs = new Set();
+      for (let i = 0; i < postings.length; i += 2) {
+        const [docId, heading, anchor] = index.sections[postings[i]];
+        const score = postings[i + 1] * idf;
+        const hit = docScores.get(docId) || { score: 0, terms: 0, best: 0, heading: '', anchor: '' };
+        if (!seenDocs.has(docId)) {
+          hit.terms += 1;
+          seenDocs.add(docId);
+        }
+        hit.score += score;
+        if (score > hit.best) {
+          hit.best = score;
+          hit.heading = heading;
+          hit.anchor = anchor;
+        }
+        docScores.set(docId, hit);
+      }
+    });
+
+    const results = new Map();
+    docScores.forEach((hit, docId) => {
+      if (hit.terms < terms.length) return;
+      const [path, title] = index.docs[docId];
+      results.set(path, { score: hit.score, heading: hit.heading, anchor: hit.anchor, title });
+    });
+    return results;
+  }
+
   function render(list) {
     if (!list.length) {
       grid.innerHTML = `
@@ -55,20 +166,26 @@
     grid.innerHTML = list.map((page) => `
       <a class="link-tile" href="${page.href}">
         <span class="link-tag">${page.kind}</span>
-        <strong>${page.title}</strong>
-        <small>${page.path}</small>
+        <strong>${escapeHtml(page.title)}</strong>
+        ${page.match ? `<small>&sect; ${escapeHtml(page.match)}</small>` : ''}
+        <small>${escapeHtml(page.path)}</small>
       </a>
     `).join('');
 
     count.textContent = `// ${list.length} page${list.length === 1 ? '' : 's'} shown`;
   }
 
-  function applyFilters() {
+  function escapeHtml(value) {
+    return String(value).replace(/[&<>"']/g, (ch) => `&#${ch.charCodeAt(0)};`);
+  }
+
+  async function applyFilters() {
     const query = (searchInput?.value || '').trim().toLowerCase();
+    const seq = ++searchSeq;
+    const kindOk = (page) => selectedKind === 'all' || page.kind === selectedKind;
 
     const filtered = pages.filter((page) => {
-      const kindOk = selectedKind === 'all' || page.kind === selectedKind;
-      if (!kindOk) return false;
+      if (!kindOk(page)) return false;
 
       if (!query) return true;
 
@@ -77,6 +194,32 @@
     });
 
     render(filtered);
+    if (query.length < 2) return;
+
+    const hits = await searchContent(query);
+    if (seq !== searchSeq || !hits.size) return;
+
+    const byPath = new Map(pages.map((page) => [page.path, page]));
+    const contentMatches = [];
+    hits.forEach((hit, path) => {
+      const page = byPath.get(path) || {
+        path,
+        title: hit.title,
+        kind: categorize(path),
+        href: `mirror${path}`
+      };
+      if (!kindOk(page)) return;
+      contentMatches.push({
+        ...page,
+        href: hit.anchor ? `${page.href}#${hit.anchor}` : page.href,
+        match: hit.heading,
+        score: hit.score
+      });
+    });
+    contentMatches.sort((a, b) => b.score - a.score);
+
+    const shown = new Set(contentMatches.map((page) => page.path));
+    render([...contentMatches, ...filtered.filter((page) => !shown.has(page.path))]);
   }
 
   chips.forEach((chip) => {
@@ -91,29 +234,45 @@
     searchInput.addEventListener('input', applyFilters);
   }
 
-  async function loadSitemap() {
-    try {
-      const response = await fetch('mirror/sitemap.xml', { cache: 'no-store' });
-      if (!response.ok) throw new Error(`HTTP ${response.status}`);
-
-      const xmlText = await response.text();
-      const parsed = new DOMParser().parseFromString(xmlText, 'application/xml');
-      const locNodes = Array.from(parsed.querySelectorAll('url > loc'));
+  async function loadPageIndex() {
+    // Compact index written next to the sitemap by scripts/build_sql_guide.py.
+    const response = await fetch('mirror/sitemap.json', { cache: 'no-cache' });
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+    const index = await response.json();
+    return index.pages.map(([path]) => path);
+  }
 
-      const rawLocs = locNodes
-        .map((node) => node.textContent || '')
-        .map((text) => text.trim())
-        .filter(Boolean);
+  async function loadSitemapXml() {
+    const response = await fetch('mirror/sitemap.xml', { cache: 'no-store' });
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
 
-      pages = rawLocs.map((loc) => {
-        let pathname = '/';
+    const xmlText = await response.text();
+    const parsed = new DOMParser().parseFromString(xmlText, 'application/xml');
+    const locNodes = Array.from(parsed.querySelectorAll('url > loc'));
 
+    return locNodes
+      .map((node) => node.textContent || '')
+      .map((text) => text.trim())
+      .filter(Boolean)
+      .map((loc) => {
         try {
-          pathname = new URL(loc).pathname;
+          return new URL(loc).pathname;
         } catch {
-          pathname = loc;
+          return loc;
         }
+      });
+  }
+
+  async function loadSitemap() {
+    try {
+      let pathnames;
+      try {
+        pathnames = await loadPageIndex();
+      } catch {
+        pathnames = await loadSitemapXml();
+      }
 
+      pages = pathnames.map((pathname) => {
         const normalized = normalizePath(pathname);
         return {
           path: normalized,
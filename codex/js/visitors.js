@@ -59,7 +59,8 @@
       throw new Error('file protocol has no API support');
     }
 
-    const response = await fetch(`${apiUrl}?limit=5000`, { cache: 'no-store' });
+    // no-cache revalidates with If-None-Match; an unchanged log comes back as a 304.
+    const response = await fetch(`${apiUrl}?limit=5000`, { cache: 'no-cache' });
     if (!response.ok) {
       throw new Error(`HTTP ${response.status}`);
     }
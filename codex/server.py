@@ -2,66 +2,879 @@
 """Local Codex static server with file-backed visitor log API.
 
 Serves repository files and exposes:
-  GET    /api/visitors
+  GET    /api/visitors?limit=N[&fingerprint=F]
   POST   /api/visitors
   DELETE /api/visitors
+  GET    /api/visitors/<id>
+  DELETE /api/visitors/<id>
+  GET    /api/sessions?limit=N[&fingerprint=F]
+  GET    /api/sessions/<session id>
+  GET    /api/stats
 
 Also supports the same API under /codex/api/visitors for root-served mode.
+GET responses carry an ETag derived from the visitor store's write version;
+a matching If-None-Match is answered with 304 Not Modified.
+POSTs are rate limited per client address and fingerprint (429) and, once
+their body has been read, shed with 503 when too many are already waiting on
+the log; /api/stats reports the accepted and dropped counts. Posted records
+get their ip, browser, os, device, location and fingerprint filled in
+server-side (see enrichment.py), and are grouped into per-fingerprint sessions (see VisitorStore).
+Content-hashed asset copies written by scripts/build_sql_guide.py
+(name.<hash>.ext) are served with a one-year immutable Cache-Control.
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
+import math
+import os
+import re
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from urllib.parse import parse_qs, urlparse
+from urllib.parse import parse_qs, unquote, urlparse
+
+from enrichment import enrich_record
 
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
 CODEX_DIR = REPO_ROOT / "codex"
 DATA_DIR = CODEX_DIR / "data"
 DATA_FILE = DATA_DIR / "visitors.jsonl"
+SUMMARY_VERSION = 1
+SUMMARY_CHECK_BYTES = 256
+SUMMARY_SLACK = 256 * 1024
 MAX_RECORDS = 5000
+MAX_LOG_BYTES = 4 * 1024 * 1024
 MAX_BODY_BYTES = 128_000
+SOCKET_TIMEOUT = 10
 API_PATHS = {"/api/visitors", "/codex/api/visitors"}
+STATS_PATHS = {"/api/stats", "/codex/api/stats"}
+SESSION_PATHS = {"/api/sessions", "/codex/api/sessions"}
+FINGERPRINTED_PATH_RE = re.compile(r"\.[0-9a-f]{10}\.[A-Za-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+RESPONSE_CACHE_SIZE = 64
+TAIL_BLOCK_SIZE = 64 * 1024
+TOMBSTONE_PREFIX = b'{"deleted": '
+SESSION_PREFIX = b'{"session": '
+SESSION_TIMEOUT = 30 * 60
+HIT_FIELDS = ("id", "page", "reason", "referrer", "recordedAt", "serverRecordedAt")
+COMPACT_SLACK = 500
+DURABILITY_MODES = ("none", "group-commit", "always")
+RATE_LIMIT_PER_SECOND = 1.0
+RATE_LIMIT_BURST = 30
+RATE_LIMIT_PER_IP_PER_SECOND = 5.0
+RATE_LIMIT_PER_IP_BURST = 120
+MAX_RATE_BUCKETS = 10_000
+MAX_PENDING_WRITES = 32
+OVERLOAD_RETRY_AFTER = 1
+
+
+def parse_line(line: bytes) -> dict | None:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        entry = json.loads(line)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+def encode_record(record: dict) -> bytes:
+    return json.dumps(record, ensure_ascii=True).encode("utf-8") + b"\n"
+
+
+def line_kind(line: bytes) -> str:
+    # Decided by the first key alone, so counting needs no JSON parsing.
+    line = line.lstrip()
+    if line.startswith(TOMBSTONE_PREFIX):
+        return "tombstone"
+    if line.startswith(SESSION_PREFIX):
+        return "session"
+    return "hit"
+
+
+def parse_time(value: object) -> float:
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return 0.0
 
 
-def read_records() -> list[dict]:
-    if not DATA_FILE.exists():
-        return []
+def split_hit(record: dict, session_id: str, attrs: dict) -> dict:
+    """Return the per-hit part of record: HIT_FIELDS plus whatever differs from the session."""
+    hit = {"id": record["id"]}
+    for key, value in record.items():
+        if key != "id" and (key in HIT_FIELDS or key not in attrs or attrs[key] != value):
+            hit[key] = value
+    hit["session"] = session_id
+    return hit
 
+
+def iter_lines_reversed(path: Path, block_size: int = TAIL_BLOCK_SIZE) -> Iterator[bytes]:
+    """Yield the file's lines newest first, reading fixed-size blocks backwards from EOF."""
+    try:
+        handle = path.open("rb")
+    except FileNotFoundError:
+        return
+    with handle:
+        position = handle.seek(0, os.SEEK_END)
+        partial = b""
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            handle.seek(position)
+            lines = (handle.read(step) + partial).split(b"\n")
+            # The first piece may continue in the previous block.
+            partial = lines.pop(0)
+            yield from reversed(lines)
+        yield partial
+
+
+def session_attrs(entry: dict) -> dict:
+    return {key: value for key, value in entry.items() if key not in ("session", "startedAt")}
+
+
+def tail_records(limit: int, attrs_for: Callable[[str], dict], fingerprint: str = "") -> list[dict]:
+    """Parse only as many lines from the end of the log as it takes to find limit records.
+
+    Hits are merged with their session's attributes, which attrs_for looks
+    up by session id.
+    """
     records: list[dict] = []
-    with DATA_FILE.open("r", encoding="utf-8") as handle:
-        for line in handle:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                entry = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            if isinstance(entry, dict):
-                records.append(entry)
+    # Reading newest first, a tombstone is always seen before the record it
+    # deletes, and the newest hit with an id before the older ones it replaced.
+    hidden: set[str] = set()
+    for line in iter_lines_reversed(DATA_FILE):
+        kind = line_kind(line)
+        if kind == "session":
+            continue
+        entry = parse_line(line)
+        if entry is None:
+            continue
+        if kind == "tombstone":
+            hidden.add(entry.get("deleted"))
+            continue
+        record_id = entry.get("id")
+        if record_id in hidden:
+            continue
+        if isinstance(record_id, str):
+            hidden.add(record_id)
+        session_id = entry.get("session")
+        record = {**attrs_for(session_id), **entry} if isinstance(session_id, str) else entry
+        if fingerprint and record.get("fingerprint") != fingerprint:
+            continue
+        records.append(record)
+        if len(records) >= limit:
+            break
     return records
 
 
-def write_records(records: list[dict]) -> None:
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    with DATA_FILE.open("w", encoding="utf-8") as handle:
-        for record in records:
-            handle.write(json.dumps(record, ensure_ascii=True))
-            handle.write("\n")
+def recent_sessions(now: float, attrs_for: Callable[[str], dict]) -> dict[str, tuple[str, float]]:
+    """Return {fingerprint: (session id, last hit time)} for sessions with a hit in the last SESSION_TIMEOUT.
+
+    Only the hits inside that window are read, from the end of the log.
+    """
+    recent: dict[str, tuple[str, float]] = {}
+    for line in iter_lines_reversed(DATA_FILE):
+        if line_kind(line) != "hit":
+            continue
+        entry = parse_line(line)
+        if entry is None:
+            continue
+        seen = parse_time(entry.get("serverRecordedAt"))
+        if now - seen > SESSION_TIMEOUT:
+            break
+        session_id = entry.get("session")
+        attrs = attrs_for(session_id) if isinstance(session_id, str) else None
+        if attrs:
+            recent.setdefault(str(attrs.get("fingerprint", "")), (entry["session"], seen))
+    return recent
+
+
+def summary_path() -> Path:
+    return DATA_FILE.with_name(f"{DATA_FILE.stem}.summary.json")
+
+
+def check_bytes(path: Path, size: int) -> str:
+    """Hash the last SUMMARY_CHECK_BYTES before size, to tell whether the log still starts as it did."""
+    length = min(size, SUMMARY_CHECK_BYTES)
+    try:
+        with path.open("rb") as handle:
+            handle.seek(size - length)
+            data = handle.read(length)
+    except FileNotFoundError:
+        data = b""
+    return hashlib.sha1(data).hexdigest() if len(data) == length else ""
+
+
+def read_summary(path: Path) -> tuple[dict[str, int], dict[str, int], int] | None:
+    """Return (line counts, session line offsets, bytes covered) from path's summary file.
+
+    None when there is none, or when path no longer begins with the bytes
+    the summary was taken from (compacted, cleared or replaced since).
+    """
+    try:
+        summary = json.loads(summary_path().read_bytes())
+        if summary["version"] != SUMMARY_VERSION:
+            return None
+        size, counts, sessions = int(summary["size"]), dict(summary["counts"]), dict(summary["sessions"])
+        check = summary["check"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if size > file_stamp(path)[1] or check_bytes(path, size) != check:
+        return None
+    return counts, sessions, size
+
+
+def write_summary(path: Path, counts: dict[str, int], sessions: dict[str, int], size: int) -> None:
+    summary = {
+        "version": SUMMARY_VERSION,
+        "size": size,
+        "check": check_bytes(path, size),
+        "counts": counts,
+        "sessions": sessions,
+    }
+    # Only a cache: it is checked against the log on load, so no fsync.
+    target = summary_path()
+    temp = target.with_name(f".{target.name}.tmp")
+    temp.write_text(json.dumps(summary, separators=(",", ":")), encoding="utf-8")
+    os.replace(temp, target)
+
+
+def scan_summary(path: Path, start: int, counts: dict[str, int], sessions: dict[str, int]) -> int:
+    """Count the lines from byte start on by kind and note where each session line is.
+
+    Line kinds come from the first key, so hit lines and tombstones are
+    never JSON-parsed. A trailing line without its newline is left for the
+    next scan; returns the offset reached.
+    """
+    try:
+        handle = path.open("rb")
+    except FileNotFoundError:
+        return start
+    with handle:
+        handle.seek(start)
+        offset = start
+        for line in handle:
+            if not line.endswith(b"\n"):
+                break
+            if line.strip():
+                kind = line_kind(line)
+                counts[kind] += 1
+                entry = parse_line(line) if kind == "session" else None
+                if entry is not None:
+                    sessions[entry["session"]] = offset
+            offset += len(line)
+    return offset
+
+
+@dataclass
+class LogIndex:
+    """Id and session bookkeeping for the id and session endpoints."""
+
+    offsets: dict[str, int] = field(default_factory=dict)
+    # session id -> {"attrs", "startedAt", "lastSeen", "ids"}
+    sessions: dict[str, dict] = field(default_factory=dict)
+
+    def add_session(self, session_id: str, attrs: dict, started_at: str) -> None:
+        session = {"attrs": attrs, "startedAt": started_at, "lastSeen": started_at, "ids": []}
+        self.sessions[session_id] = session
+
+    def add_hit(self, hit: dict, offset: int) -> None:
+        record_id = hit.get("id")
+        if not isinstance(record_id, str):
+            return
+        self.offsets[record_id] = offset
+        session = self.sessions.get(hit.get("session"))
+        if session:
+            session["ids"].append(record_id)
+            session["lastSeen"] = hit.get("serverRecordedAt", session["lastSeen"])
+
+    def remove(self, record_id: str, session_id: str | None = None) -> bool:
+        if self.offsets.pop(record_id, None) is None:
+            return False
+        session = self.sessions.get(session_id)
+        if session and record_id in session["ids"]:
+            session["ids"].remove(record_id)
+        return True
+
+
+def scan_log(path: Path) -> LogIndex:
+    """Read the whole log once into a LogIndex."""
+    log = LogIndex()
+    offset = 0
+    hit_sessions: dict[str, str] = {}
+    try:
+        handle = path.open("rb")
+    except FileNotFoundError:
+        return log
+    with handle:
+        for line in handle:
+            entry = parse_line(line)
+            kind = line_kind(line)
+            if entry is not None and kind == "tombstone":
+                record_id = entry.get("deleted")
+                log.remove(record_id, hit_sessions.pop(record_id, None))
+            elif entry is not None and kind == "session":
+                log.add_session(entry["session"], session_attrs(entry), entry.get("startedAt", ""))
+            elif entry is not None:
+                record_id = entry.get("id")
+                if isinstance(record_id, str) and record_id in log.offsets:
+                    log.remove(record_id, hit_sessions.get(record_id))
+                log.add_hit(entry, offset)
+                if isinstance(record_id, str) and entry.get("session"):
+                    hit_sessions[record_id] = entry["session"]
+            offset += len(line)
+    return log
+
+
+def fsync_path(path: Path) -> None:
+    # A directory fsync makes a rename or a newly created file durable.
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def file_stamp(path: Path) -> tuple[int, int]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return (0, 0)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class VisitorStore:
+    """Append-only, sessionized visitor log with cached GET response bodies.
+
+    version goes up on every write, and the ETag pairs it with a per-process
+    token so a restarted server never reuses an old tag. Serialized GET bodies
+    are cached per query key until the next write.
+
+    Hits are grouped into sessions by fingerprint; a hit more than
+    SESSION_TIMEOUT seconds after the previous one starts a new session. A
+    session line ({"session": id, ...}) holds the attributes shared by its
+    hits and is written once, each hit line only HIT_FIELDS and whatever
+    differs from its session. Lines written before sessions existed are read
+    as whole records.
+
+    Only the id and session endpoints need the LogIndex (id offsets and
+    per-session hits), so only they build it, with one full scan, and it is
+    kept up to date after that. Everything else gets by with line counts and
+    the offsets of the session lines, kept in a summary file next to the log
+    (see summary_path): on load only the bytes appended since it was written
+    are scanned, and the whole log only when the summary is missing or no
+    longer matches. It is rewritten after such a scan, every SUMMARY_SLACK
+    appended bytes, after compaction and clear, and by save_summary. A
+    session's attributes are read from its line when a hit first needs
+    them. Listing records then reads back from the end of the file until it
+    has limit hits, and POST, which appends one line (two when it starts a
+    session), reads back only as far as SESSION_TIMEOUT to find the
+    fingerprint's open session.
+
+    Deleting a record appends a tombstone ({"deleted": id, ...}); once
+    COMPACT_SLACK lines are dead or the file passes MAX_LOG_BYTES by an
+    eighth, the log is rewritten with the newest live hits that fit in
+    MAX_LOG_BYTES and their sessions.
+
+    Every cache is only valid for the file stat this store last produced or
+    read. Any other stat means the file was changed behind the store's back:
+    the caches are dropped and version goes up, so no stale body or 304 is
+    ever served.
+
+    durability decides when an append is reported back to the client:
+    - "none": once it is written to the OS, so a crash may lose recent records
+    - "always": after an fsync of its own
+    - "group-commit": after an fsync shared with every append made meanwhile.
+      A writer that finds no fsync in flight starts one at once, so a lone
+      writer never waits on a timer. Writers that arrive while it runs wait
+      for it to finish, and then the first of them fsyncs for all of them.
+      Writers never hold the store lock while waiting, so reads and further
+      appends carry on.
+    Compaction and clear fsync the rewritten file in every mode but "none".
+    """
+
+    def __init__(self, durability: str = "group-commit") -> None:
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"unknown durability mode: {durability}")
+        self.durability = durability
+        self.lock = threading.Lock()
+        self.version = 0
+        self.token = format(time.time_ns(), "x")
+        self._responses: dict[tuple, bytes] = {}
+        self._observed: tuple[int, int] | None = None
+        self._log: LogIndex | None = None
+        self._counts: dict[str, int] | None = None
+        self._recent: dict[str, tuple[str, float]] | None = None
+        self._session_offsets: dict[str, int] = {}
+        self._attrs: dict[str, dict] = {}
+        self._summarized = 0
+        self._sync = threading.Condition()
+        self._written = 0
+        self._synced = 0
+        self._syncing = False
+
+    def etag(self) -> str:
+        return f'"{self.token}-{self.version}"'
+
+    def _changed(self) -> None:
+        self.version += 1
+        self._responses.clear()
+        self._observed = file_stamp(DATA_FILE)
+
+    def _forget(self) -> None:
+        self._log = None
+        self._counts = None
+        self._recent = None
+
+    def _refresh(self) -> None:
+        # Caller holds the lock. A stamp this store did not write means the
+        # file was edited, replaced or removed from outside the server.
+        if file_stamp(DATA_FILE) != self._observed:
+            self._forget()
+            self._changed()
+
+    def _load_index(self) -> LogIndex:
+        if self._log is None:
+            self._log = scan_log(DATA_FILE)
+        return self._log
+
+    def _load_counts(self) -> dict[str, int]:
+        if self._counts is None:
+            summary = read_summary(DATA_FILE)
+            counts, offsets, start = summary or ({"hit": 0, "session": 0, "tombstone": 0}, {}, 0)
+            end = scan_summary(DATA_FILE, start, counts, offsets)
+            self._counts, self._session_offsets, self._attrs = counts, offsets, {}
+            self._summarized = start
+            if summary is None or end > start:
+                self._save_summary(end)
+        return self._counts
+
+    def _save_summary(self, size: int) -> None:
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        write_summary(DATA_FILE, self._counts, self._session_offsets, size)
+        self._summarized = size
+
+    def save_summary(self) -> None:
+        """Write the summary file if appends made since the last one would otherwise be rescanned."""
+        with self.lock:
+            self._refresh()
+            if self._counts is not None and self._observed[1] != self._summarized:
+                self._save_summary(self._observed[1])
+
+    def _session_attrs(self, session_id: str) -> dict:
+        # Caller has loaded the counts, and with them the session offsets.
+        attrs = self._attrs.get(session_id)
+        if attrs is None:
+            attrs = {}
+            offset = self._session_offsets.get(session_id)
+            if offset is not None:
+                with DATA_FILE.open("rb") as handle:
+                    handle.seek(offset)
+                    entry = parse_line(handle.readline())
+                if entry is not None and entry.get("session") == session_id:
+                    attrs = session_attrs(entry)
+            self._attrs[session_id] = attrs
+        return attrs
+
+    def _live(self) -> int:
+        counts = self._load_counts()
+        # Each tombstone stands for itself and the hit it deleted.
+        return max(0, counts["hit"] - counts["tombstone"])
+
+    def current_etag(self) -> str:
+        with self.lock:
+            self._refresh()
+            return self.etag()
+
+    def _cached(self, key: tuple, build) -> tuple[str, bytes]:
+        with self.lock:
+            self._refresh()
+            body = self._responses.get(key)
+            if body is None:
+                body = json.dumps(build(), ensure_ascii=True).encode("utf-8")
+                if len(self._responses) >= RESPONSE_CACHE_SIZE:
+                    self._responses.clear()
+                self._responses[key] = body
+            return self.etag(), body
+
+    def response(self, limit: int, fingerprint: str = "") -> tuple[str, bytes]:
+        return self._cached(
+            ("records", limit, fingerprint),
+            lambda: {
+                "records": self._tail(limit, fingerprint),
+                "count": self._live(),
+                "stored_file": "codex/data/visitors.jsonl",
+            },
+        )
+
+    def _tail(self, limit: int, fingerprint: str) -> list[dict]:
+        self._load_counts()
+        return tail_records(limit, self._session_attrs, fingerprint)
 
+    def sessions_response(self, limit: int, fingerprint: str = "") -> tuple[str, bytes]:
+        def build() -> dict:
+            found = [
+                (session_id, session)
+                for session_id, session in self._load_index().sessions.items()
+                if session["ids"] and (not fingerprint or session["attrs"].get("fingerprint") == fingerprint)
+            ]
+            found.sort(key=lambda item: parse_time(item[1]["lastSeen"]), reverse=True)
+            return {
+                "sessions": [session_summary(session_id, session) for session_id, session in found[:limit]],
+                "count": len(found),
+            }
 
-def trim_records(records: list[dict], limit: int) -> list[dict]:
-    if len(records) <= limit:
-        return records
-    return records[-limit:]
+        return self._cached(("sessions", limit, fingerprint), build)
+
+    def session(self, session_id: str) -> dict | None:
+        """Return the session's summary and its hits (as stored, oldest first)."""
+        with self.lock:
+            self._refresh()
+            log = self._load_index()
+            session = log.sessions.get(session_id)
+            if session is None or not session["ids"]:
+                return None
+            hits = []
+            with DATA_FILE.open("rb") as handle:
+                for record_id in session["ids"]:
+                    handle.seek(log.offsets[record_id])
+                    hit = parse_line(handle.readline())
+                    if hit is not None:
+                        hits.append(hit)
+            return {"session": session_summary(session_id, session), "hits": hits}
+
+    def _append_line(self, line: bytes, kind: str, session_id: str = "") -> int:
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        with DATA_FILE.open("ab") as handle:
+            offset = handle.tell()
+            handle.write(line)
+            if self.durability == "always":
+                handle.flush()
+                os.fsync(handle.fileno())
+        with self._sync:
+            self._written += 1
+        if self._counts is not None:
+            self._counts[kind] += 1
+            if session_id:
+                self._session_offsets[session_id] = offset
+        self._changed()
+        if self._counts is not None and self._observed[1] - self._summarized >= SUMMARY_SLACK:
+            self._save_summary(self._observed[1])
+        return offset
+
+    def _compact_if_needed(self) -> None:
+        counts = self._load_counts()
+        dead = 2 * counts["tombstone"]
+        if dead < COMPACT_SLACK and self._observed[1] <= MAX_LOG_BYTES + MAX_LOG_BYTES // 8:
+            return
+
+        session_lines: dict[str, bytes] = {}
+        hits: list[tuple[str | None, bytes] | None] = []
+        latest: dict[str, int] = {}
+        with DATA_FILE.open("rb") as handle:
+            for line in handle:
+                entry = parse_line(line)
+                kind = line_kind(line)
+                if entry is None:
+                    continue
+                if kind == "session":
+                    session_lines[entry["session"]] = line
+                elif kind == "tombstone" and entry.get("deleted") in latest:
+                    hits[latest.pop(entry["deleted"])] = None
+                elif kind == "hit":
+                    record_id = entry.get("id")
+                    if isinstance(record_id, str):
+                        # A reused id replaces the older hit, as in the LogIndex.
+                        if record_id in latest:
+                            hits[latest[record_id]] = None
+                        latest[record_id] = len(hits)
+                    hits.append((entry.get("session"), line))
+        live = [hit for hit in hits if hit is not None]
+
+        # Newest hits first, each paying for its session line the first time.
+        budget = MAX_LOG_BYTES
+        needed: set[str] = set()
+        start = len(live)
+        while start > 0:
+            session_id, line = live[start - 1]
+            cost = len(line)
+            if session_id in session_lines and session_id not in needed:
+                cost += len(session_lines[session_id])
+            if cost > budget:
+                break
+            budget -= cost
+            if session_id in session_lines:
+                needed.add(session_id)
+            start -= 1
+
+        written: dict[str, int] = {}
+        temp = DATA_FILE.with_name(f".{DATA_FILE.name}.compact")
+        with temp.open("wb") as handle:
+            for session_id, line in live[start:]:
+                if session_id in needed and session_id not in written:
+                    written[session_id] = handle.tell()
+                    handle.write(session_lines[session_id])
+                handle.write(line)
+            if self.durability != "none":
+                handle.flush()
+                os.fsync(handle.fileno())
+        os.replace(temp, DATA_FILE)
+        if self.durability != "none":
+            fsync_path(DATA_DIR)
+        # Offsets moved and dropped sessions are gone; the recent sessions and
+        # their attributes are the newest ones, so they were kept.
+        self._log = None
+        self._counts = {"hit": len(live) - start, "session": len(written), "tombstone": 0}
+        self._session_offsets = written
+        self._attrs = {
+            session_id: attrs for session_id, attrs in self._attrs.items() if session_id in written
+        }
+        self._changed()
+        self._save_summary(self._observed[1])
+
+    def _wait_durable(self, sequence: int) -> None:
+        if self.durability != "group-commit":
+            return
+        with self._sync:
+            while self._synced < sequence:
+                if self._syncing:
+                    self._sync.wait()
+                    continue
+                self._syncing = True
+                target = self._written
+                # Appends keep landing while the leader syncs; they make up the next batch.
+                self._sync.release()
+                try:
+                    if DATA_FILE.exists():
+                        fsync_path(DATA_FILE)
+                finally:
+                    self._sync.acquire()
+                    self._synced = max(self._synced, target)
+                    self._syncing = False
+                    self._sync.notify_all()
+
+    def append(self, record: dict) -> tuple[str, int]:
+        """Append record under a fresh id and return (id, count).
+
+        Any id the client sent is replaced: telling whether it is already
+        taken would mean building the LogIndex on every cold POST.
+        """
+        record = {key: value for key, value in record.items() if key not in ("deleted", "session")}
+        record["id"] = uuid.uuid4().hex
+        with self.lock:
+            self._refresh()
+
+            fingerprint = str(record.get("fingerprint", ""))
+            now = str(record.get("serverRecordedAt", ""))
+            seen = parse_time(now)
+            self._load_counts()
+            if self._recent is None:
+                self._recent = recent_sessions(seen, self._session_attrs)
+            session_id, last_seen = self._recent.get(fingerprint, ("", 0.0))
+            if session_id not in self._session_offsets or seen - last_seen > SESSION_TIMEOUT:
+                session_id = uuid.uuid4().hex
+                attrs = {key: value for key, value in record.items() if key not in HIT_FIELDS}
+                line = encode_record({"session": session_id, "startedAt": now, **attrs})
+                self._append_line(line, "session", session_id)
+                self._attrs[session_id] = attrs
+                if self._log is not None:
+                    self._log.add_session(session_id, attrs, now)
+
+            hit = split_hit(record, session_id, self._session_attrs(session_id))
+            offset = self._append_line(encode_record(hit), "hit")
+            self._recent[fingerprint] = (session_id, seen)
+            if self._log is not None:
+                self._log.add_hit(hit, offset)
+            sequence = self._written
+            self._compact_if_needed()
+            stored = self._live()
+        self._wait_durable(sequence)
+        return record["id"], stored
+
+    def get(self, record_id: str) -> dict | None:
+        with self.lock:
+            self._refresh()
+            log = self._load_index()
+            offset = log.offsets.get(record_id)
+            if offset is None:
+                return None
+            with DATA_FILE.open("rb") as handle:
+                handle.seek(offset)
+                hit = parse_line(handle.readline())
+            session = log.sessions.get(hit.get("session")) if hit else None
+            return {**session["attrs"], **hit} if session else hit
+
+    def delete(self, record_id: str) -> int | None:
+        """Tombstone one record; returns the remaining count, or None when the id is unknown."""
+        with self.lock:
+            self._refresh()
+            log = self._load_index()
+            offset = log.offsets.get(record_id)
+            if offset is None:
+                return None
+            with DATA_FILE.open("rb") as handle:
+                handle.seek(offset)
+                hit = parse_line(handle.readline()) or {}
+            tombstone = {"deleted": record_id, "serverRecordedAt": datetime.now(timezone.utc).isoformat()}
+            self._append_line(encode_record(tombstone), "tombstone")
+            sequence = self._written
+            log.remove(record_id, hit.get("session"))
+            self._compact_if_needed()
+            stored = self._live()
+        self._wait_durable(sequence)
+        return stored
+
+    def clear(self) -> None:
+        with self.lock:
+            DATA_DIR.mkdir(parents=True, exist_ok=True)
+            DATA_FILE.write_bytes(b"")
+            if self.durability != "none":
+                fsync_path(DATA_FILE)
+            self._log = LogIndex()
+            self._counts = {"hit": 0, "session": 0, "tombstone": 0}
+            self._recent = {}
+            self._session_offsets = {}
+            self._attrs = {}
+            self._changed()
+            self._save_summary(0)
+
+
+def session_summary(session_id: str, session: dict) -> dict:
+    return {
+        "session": session_id,
+        "startedAt": session["startedAt"],
+        "lastSeen": session["lastSeen"],
+        "hits": len(session["ids"]),
+        "attrs": session["attrs"],
+    }
+
+
+class IngestLimits:
+    """Admission control for POST /api/visitors.
+
+    A POST spends one token from two buckets: one per client address
+    (ip_burst tokens, refilled at ip_rate per second) and one per (address,
+    fingerprint) pair (burst tokens at rate per second). Either bucket being
+    empty answers 429. The fingerprint embeds the client-supplied timezone
+    and User-Agent, so the address bucket is what caps a client that varies
+    them; it is sized to leave room for several visitors behind one NAT. At
+    most max_pending POSTs may be waiting on the store at once, and the next
+    one is answered 503; a POST only asks for its slot once its body has been
+    read, within the handler's socket timeout. Both carry Retry-After. A rate of 0 turns that
+    bucket off. Past MAX_RATE_BUCKETS buckets, the ones that have refilled
+    completely are forgotten, since a new bucket starts out full anyway.
+    """
+
+    def __init__(
+        self,
+        rate: float = RATE_LIMIT_PER_SECOND,
+        burst: int = RATE_LIMIT_BURST,
+        max_pending: int = MAX_PENDING_WRITES,
+        ip_rate: float = RATE_LIMIT_PER_IP_PER_SECOND,
+        ip_burst: int = RATE_LIMIT_PER_IP_BURST,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.ip_rate = ip_rate
+        self.ip_burst = ip_burst
+        self.max_pending = max_pending
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.counters = {"accepted": 0, "rate_limited": 0, "overloaded": 0}
+        self._buckets: dict[tuple[str, ...], tuple[float, float]] = {}
+
+    def admit(self) -> bool:
+        with self.lock:
+            if self.pending >= self.max_pending:
+                self.counters["overloaded"] += 1
+                return False
+            self.pending += 1
+            return True
+
+    def release(self, accepted: bool) -> None:
+        with self.lock:
+            self.pending -= 1
+            self.counters["accepted"] += accepted
+
+    def _limits(self, key: tuple[str, ...]) -> tuple[float, int]:
+        # Address buckets are keyed (address,), fingerprint buckets (address, fingerprint).
+        return (self.ip_rate, self.ip_burst) if len(key) == 1 else (self.rate, self.burst)
+
+    def _level(self, key: tuple[str, ...], now: float) -> float:
+        rate, burst = self._limits(key)
+        tokens, updated = self._buckets.get(key, (burst, now))
+        return min(burst, tokens + (now - updated) * rate)
+
+    def spend(self, address: str, fingerprint: str) -> float:
+        """Take a token from both of the client's buckets; returns 0 when allowed, else seconds to wait."""
+        now = time.monotonic()
+        keys = [key for key in ((address,), (address, fingerprint)) if self._limits(key)[0] > 0]
+        with self.lock:
+            levels = {key: self._level(key, now) for key in keys}
+            waits = [(1 - tokens) / self._limits(key)[0] for key, tokens in levels.items() if tokens < 1]
+            if waits:
+                # Nothing is spent unless every bucket has a token to give.
+                self._buckets.update({key: (tokens, now) for key, tokens in levels.items()})
+                self.counters["rate_limited"] += 1
+                return max(waits)
+            if any(key not in self._buckets for key in keys) and len(self._buckets) >= MAX_RATE_BUCKETS:
+                self._prune(now)
+            self._buckets.update({key: (tokens - 1, now) for key, tokens in levels.items()})
+            return 0.0
+
+    def _prune(self, now: float) -> None:
+        self._buckets = {
+            key: (tokens, updated)
+            for key, (tokens, updated) in self._buckets.items()
+            if self._level(key, now) < self._limits(key)[1]
+        }
+        # Still full of active clients: drop the longest-idle ones.
+        if len(self._buckets) >= MAX_RATE_BUCKETS:
+            by_age = sorted(self._buckets.items(), key=lambda item: item[1][1])
+            self._buckets = dict(by_age[len(by_age) // 2 :])
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                **self.counters,
+                "dropped": self.counters["rate_limited"] + self.counters["overloaded"],
+                "pending": self.pending,
+                "max_pending": self.max_pending,
+                "buckets": len(self._buckets),
+                "rate_per_second": self.rate,
+                "burst": self.burst,
+                "ip_rate_per_second": self.ip_rate,
+                "ip_burst": self.ip_burst,
+            }
+
+
+STORE = VisitorStore()
+INGEST = IngestLimits()
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
 
 
 class CodexHandler(SimpleHTTPRequestHandler):
+    # Applied to the socket, so a client that trickles its headers or body
+    # is cut off instead of holding a thread (and, for a POST, its slot).
+    timeout = SOCKET_TIMEOUT
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=str(REPO_ROOT), **kwargs)
 
@@ -72,12 +885,51 @@ class CodexHandler(SimpleHTTPRequestHandler):
     def _is_api_request(self) -> bool:
         return self._request_path() in API_PATHS
 
-    def _send_json(self, status: int, payload: dict) -> None:
+    def _is_stats_request(self) -> bool:
+        return self._request_path() in STATS_PATHS
+
+    def _path_id(self, api_paths: set[str]) -> str | None:
+        path = self._request_path()
+        for api_path in api_paths:
+            item_id = path[len(api_path) + 1 :]
+            if path.startswith(f"{api_path}/") and "/" not in item_id:
+                return unquote(item_id)
+        return None
+
+    def _record_id(self) -> str | None:
+        return self._path_id(API_PATHS)
+
+    def send_response(self, code: int, message: str | None = None) -> None:
+        self._response_code = code
+        super().send_response(code, message)
+
+    def end_headers(self) -> None:
+        if (
+            self.command in ("GET", "HEAD")
+            and getattr(self, "_response_code", 0) == 200
+            and FINGERPRINTED_PATH_RE.search(self._request_path())
+        ):
+            self.send_header("Cache-Control", IMMUTABLE_CACHE_CONTROL)
+        super().end_headers()
+
+    def _send_json(self, status: int, payload: dict, retry_after: float = 0) -> None:
         body = json.dumps(payload, ensure_ascii=True).encode("utf-8")
+        self._send_json_bytes(status, body, retry_after=retry_after)
+
+    def _send_json_bytes(
+        self, status: int, body: bytes, etag: str | None = None, retry_after: float = 0
+    ) -> None:
         self.send_response(status)
         self.send_header("Content-Type", "application/json; charset=utf-8")
         self.send_header("Content-Length", str(len(body)))
-        self.send_header("Cache-Control", "no-store")
+        if retry_after:
+            self.send_header("Retry-After", str(max(1, math.ceil(retry_after))))
+        if etag:
+            # Cacheable, but the browser has to revalidate with If-None-Match.
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        else:
+            self.send_header("Cache-Control", "no-store")
         self.end_headers()
         self.wfile.write(body)
 
@@ -87,7 +939,7 @@ class CodexHandler(SimpleHTTPRequestHandler):
         self.end_headers()
 
     def do_OPTIONS(self) -> None:  # noqa: N802
-        if not self._is_api_request():
+        if not self._is_api_request() and self._record_id() is None:
             self._send_method_not_allowed()
             return
         self.send_response(204)
@@ -96,7 +948,30 @@ class CodexHandler(SimpleHTTPRequestHandler):
         self.end_headers()
 
     def do_GET(self) -> None:  # noqa: N802
-        if not self._is_api_request():
+        if self._is_stats_request():
+            self._send_json(200, {"ingest": INGEST.stats(), "durability": STORE.durability})
+            return
+
+        session_id = self._path_id(SESSION_PATHS)
+        if session_id is not None:
+            session = STORE.session(session_id)
+            if session is None:
+                self._send_json(404, {"error": "unknown session id"})
+            else:
+                self._send_json(200, session)
+            return
+
+        record_id = self._record_id()
+        if record_id is not None:
+            record = STORE.get(record_id)
+            if record is None:
+                self._send_json(404, {"error": "unknown record id"})
+            else:
+                self._send_json(200, {"record": record})
+            return
+
+        is_sessions = self._request_path() in SESSION_PATHS
+        if not self._is_api_request() and not is_sessions:
             super().do_GET()
             return
 
@@ -107,25 +982,57 @@ class CodexHandler(SimpleHTTPRequestHandler):
         except (TypeError, ValueError):
             requested_limit = 1000
         limit = max(1, min(requested_limit, MAX_RECORDS))
+        fingerprint = query.get("fingerprint", [""])[0]
 
-        all_records = read_records()
-        sliced = trim_records(all_records, limit)
-        sliced.reverse()
+        etag = STORE.current_etag()
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            return
 
-        self._send_json(
-            200,
-            {
-                "records": sliced,
-                "count": len(all_records),
-                "stored_file": "codex/data/visitors.jsonl",
-            },
-        )
+        if is_sessions:
+            etag, body = STORE.sessions_response(limit, fingerprint)
+        else:
+            etag, body = STORE.response(limit, fingerprint)
+        self._send_json_bytes(200, body, etag)
 
     def do_POST(self) -> None:  # noqa: N802
         if not self._is_api_request():
             self._send_method_not_allowed()
             return
 
+        # The whole body is read and checked before a pending slot is taken,
+        # so only requests that are ready to append can fill the slots.
+        incoming = self._read_json_body()
+        if incoming is None:
+            return
+
+        record = enrich_record(incoming, self.client_address[0], self.headers.get("User-Agent", ""))
+        retry_after = INGEST.spend(record["ip"], record["fingerprint"])
+        if retry_after:
+            self._send_json(429, {"error": "rate limit exceeded"}, retry_after=retry_after)
+            return
+
+        if not INGEST.admit():
+            self._send_json(503, {"error": "ingest queue full"}, retry_after=OVERLOAD_RETRY_AFTER)
+            return
+        accepted = False
+        try:
+            record["serverRecordedAt"] = datetime.now(timezone.utc).isoformat()
+            record_id, stored = STORE.append(record)
+            accepted = True
+        finally:
+            INGEST.release(accepted)
+
+        self._send_json(
+            201,
+            {"ok": True, "id": record_id, "stored": stored, "stored_file": "codex/data/visitors.jsonl"},
+        )
+
+    def _read_json_body(self) -> dict | None:
+        """Read the request body as a JSON object, or answer with an error and return None."""
         try:
             length = int(self.headers.get("Content-Length", "0"))
         except ValueError:
@@ -133,42 +1040,50 @@ class CodexHandler(SimpleHTTPRequestHandler):
 
         if length <= 0:
             self._send_json(400, {"error": "empty request body"})
-            return
+            return None
 
         if length > MAX_BODY_BYTES:
+            self.close_connection = True
             self._send_json(413, {"error": "payload too large"})
-            return
+            return None
+
+        try:
+            raw = self.rfile.read(length)
+        except TimeoutError:
+            self.close_connection = True
+            self._send_json(408, {"error": "request body timed out"})
+            return None
+        if len(raw) < length:
+            self.close_connection = True
+            return None
 
-        raw = self.rfile.read(length)
         try:
             incoming = json.loads(raw.decode("utf-8"))
         except (UnicodeDecodeError, json.JSONDecodeError):
             self._send_json(400, {"error": "invalid json"})
-            return
+            return None
 
         if not isinstance(incoming, dict):
             self._send_json(400, {"error": "expected json object"})
-            return
-
-        record = dict(incoming)
-        record["serverRecordedAt"] = datetime.now(timezone.utc).isoformat()
-
-        records = read_records()
-        records.append(record)
-        records = trim_records(records, MAX_RECORDS)
-        write_records(records)
-
-        self._send_json(
-            201,
-            {"ok": True, "stored": len(records), "stored_file": "codex/data/visitors.jsonl"},
-        )
+            return None
+        return incoming
 
     def do_DELETE(self) -> None:  # noqa: N802
+        record_id = self._record_id()
+        if record_id is not None:
+            stored = STORE.delete(record_id)
+            if stored is None:
+                self._send_json(404, {"error": "unknown record id"})
+            else:
+                payload = {"ok": True, "deleted": record_id, "stored": stored}
+                self._send_json(200, {**payload, "stored_file": "codex/data/visitors.jsonl"})
+            return
+
         if not self._is_api_request():
             self._send_method_not_allowed()
             return
 
-        write_records([])
+        STORE.clear()
         self._send_json(200, {"ok": True, "stored": 0, "stored_file": "codex/data/visitors.jsonl"})
 
 
@@ -176,19 +1091,65 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Serve site with Codex visitor API.")
     parser.add_argument("--host", default="127.0.0.1", help="Bind host (default: 127.0.0.1)")
     parser.add_argument("--port", type=int, default=8080, help="Bind port (default: 8080)")
+    parser.add_argument(
+        "--durability",
+        choices=DURABILITY_MODES,
+        default=STORE.durability,
+        help=f"When visitor writes are fsynced (default: {STORE.durability})",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=RATE_LIMIT_PER_SECOND,
+        help=f"Visitor POSTs per second per client+fingerprint, 0 = off (default: {RATE_LIMIT_PER_SECOND})",
+    )
+    parser.add_argument(
+        "--rate-burst",
+        type=int,
+        default=RATE_LIMIT_BURST,
+        help=f"Visitor POSTs a client may send back to back (default: {RATE_LIMIT_BURST})",
+    )
+    parser.add_argument(
+        "--ip-rate-limit",
+        type=float,
+        default=RATE_LIMIT_PER_IP_PER_SECOND,
+        help=f"Visitor POSTs per second per address, 0 = off (default: {RATE_LIMIT_PER_IP_PER_SECOND})",
+    )
+    parser.add_argument(
+        "--ip-rate-burst",
+        type=int,
+        default=RATE_LIMIT_PER_IP_BURST,
+        help=f"Visitor POSTs one address may send back to back (default: {RATE_LIMIT_PER_IP_BURST})",
+    )
+    parser.add_argument(
+        "--max-pending-writes",
+        type=int,
+        default=MAX_PENDING_WRITES,
+        help=f"Visitor POSTs in flight before new ones get a 503 (default: {MAX_PENDING_WRITES})",
+    )
     args = parser.parse_args()
 
+    INGEST.rate = args.rate_limit
+    INGEST.burst = args.rate_burst
+    INGEST.ip_rate = args.ip_rate_limit
+    INGEST.ip_burst = args.ip_rate_burst
+    INGEST.max_pending = args.max_pending_writes
+    STORE.durability = args.durability
+
     server = ThreadingHTTPServer((args.host, args.port), CodexHandler)
     print(f"Serving {REPO_ROOT} at http://{args.host}:{args.port}")
     print("Visitor API:")
     print(f"  http://{args.host}:{args.port}/api/visitors")
     print(f"  http://{args.host}:{args.port}/codex/api/visitors")
+    print(f"  http://{args.host}:{args.port}/api/sessions")
+    print(f"  http://{args.host}:{args.port}/api/stats")
     try:
         server.serve_forever()
     except KeyboardInterrupt:
         pass
     finally:
         server.server_close()
+        STORE.save_summary()
 
 
 if __name__ == "__main__":
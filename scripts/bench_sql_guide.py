@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Benchmark the guide builder stages on synthetic and real markdown corpora.
+
+Synthetic corpora are generated into a scratch directory with code-heavy,
+list-heavy and link-heavy variants at each requested size; the real
+guides/sql-guide chapters are benchmarked alongside them. Each corpus is timed
+stage by stage (discovery cold/warm, inline formatting, markdown rendering,
+templating, search indexing, writing, full build) and the full build is
+repeated under tracemalloc to report peak Python memory.
+
+Results are written as JSON so a renderer change can be compared against a
+saved baseline:
+
+    python scripts/bench_sql_guide.py --output before.json
+    python scripts/bench_sql_guide.py --baseline before.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import build_sql_guide as builder
+
+
+DEFAULT_OUTPUT = builder.ROOT / ".build-cache" / "bench" / "latest.json"
+VARIANTS = ("code", "list", "link")
+WORDS = (
+    "select from where join table index view query column row value result set group order filter "
+    "sequence schema constraint session commit rollback subquery null date number string function"
+).split()
+
+
+def sentence(rng: random.Random, words: int = 14) -> str:
+    picked = [rng.choice(WORDS) for _ in range(words)]
+    picked[rng.randrange(words)] = f"**{rng.choice(WORDS)}**"
+    picked[rng.randrange(words)] = f"`{rng.choice(WORDS).upper()}`"
+    picked[rng.randrange(words)] = f"*{rng.choice(WORDS)}*"
+    return " ".join(picked).capitalize() + "."
+
+
+def variant_block(variant: str, rng: random.Random, chapter: int) -> list[str]:
+    if variant == "code":
+        lines = ["```sql"]
+        for _ in range(rng.randint(8, 20)):
+            lines.append(f"SELECT {rng.choice(WORDS)}_id, {rng.choice(WORDS)} FROM {rng.choice(WORDS)}s")
+            lines.append(f"WHERE {rng.choice(WORDS)} < {rng.randint(1, 999)} ORDER BY 1;")
+        lines.append("```")
+        return lines
+    if variant == "list":
+        lines = [f"- {sentence(rng, 8)}" for _ in range(rng.randint(6, 14))]
+        lines.append("")
+        lines.extend(f"{idx}. {sentence(rng, 6)}" for idx in range(1, rng.randint(4, 10)))
+        return lines
+    links = []
+    for _ in range(rng.randint(6, 12)):
+        target = f"{rng.randint(1, max(1, chapter)):02d}_Chapter.md"
+        if rng.random() < 0.4:
+            target = f"https://example.com/{rng.choice(WORDS)}"
+        links.append(f"See [{rng.choice(WORDS)} notes]({target}) and [{rng.choice(WORDS)}]({target}).")
+    return [" ".join(links)]
+
+
+def chapter_markdown(variant: str, chapter: int, rng: random.Random) -> str:
+    lines = [f"# Lesson {chapter} – Synthetic {variant} chapter", "", sentence(rng, 24), ""]
+    for section in range(1, rng.randint(4, 8)):
+        lines.extend([f"## {section}. {sentence(rng, 4)[:-1]}", "", sentence(rng), ""])
+        for sub in range(1, rng.randint(2, 4)):
+            lines.extend([f"### {section}.{sub} {rng.choice(WORDS).title()}", "", sentence(rng), ""])
+            lines.extend(variant_block(variant, rng, chapter))
+            lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def generate_corpus(guides_dir: Path, variant: str, chapters: int, seed: int = 7) -> builder.Guide:
+    slug = f"bench-{variant}-{chapters}"
+    guide_dir = guides_dir / slug
+    guide_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(f"{seed}-{variant}-{chapters}")
+    toc = ["# Table of Contents", ""]
+    for chapter in range(1, chapters + 1):
+        name = f"{chapter:02d}_Chapter.md" if chapter < 100 else f"{chapter}_Chapter_{chapter}.md"
+        (guide_dir / name).write_text(chapter_markdown(variant, chapter, rng), encoding="utf-8")
+        toc.append(f"{chapter}. [Lesson {chapter}]({name})")
+    (guide_dir / builder.TOC_NAME).write_text("\n".join(toc) + "\n", encoding="utf-8")
+    return builder.guide_for(slug)
+
+
+def timed(func, *args, **kwargs) -> tuple[float, object]:
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def bench_corpus(name: str, guide: builder.Guide, site: builder.Site, repeat: int) -> dict[str, object]:
+    sources = [md for md in guide.dir.glob("*.md") if md.name != builder.TOC_NAME]
+    raws = [md.read_text(encoding="utf-8") for md in sources]
+    lines = [line for raw in raws for line in raw.splitlines() if line.strip()]
+
+    stages: dict[str, float] = {}
+
+    def record(stage: str, func, *args, **kwargs) -> object:
+        best = None
+        result = None
+        for _ in range(repeat):
+            elapsed, result = timed(func, *args, **kwargs)
+            best = elapsed if best is None else min(best, elapsed)
+        stages[stage] = round(best or 0.0, 6)
+        return result
+
+    record("discover_cold", builder.discover_chapters, guide, {})
+    cache: dict[str, dict[str, object]] = {}
+    builder.discover_chapters(guide, cache)
+    chapters = record("discover_warm", builder.discover_chapters, guide, cache)
+    record("format_inline", lambda: [builder.format_inline(line) for line in lines])
+    record("markdown_to_html", lambda: [builder.markdown_to_html(raw) for raw in raws])
+    record("render", builder.render_bodies, guide, chapters)
+
+    def template() -> list[tuple[Path, bytes]]:
+        pages: list[tuple[Path, bytes]] = []
+        for idx in range(len(chapters)):
+            pages.extend(builder.chapter_pages(guide, chapters, idx, [site]))
+        return pages + builder.index_pages(guide, chapters, [site])
+
+    pages = record("template", template)
+    record("search_index", builder.search_pages, [(guide, chapters)], [site])
+
+    def write_fresh() -> int:
+        shutil.rmtree(site.root / "guides" / guide.slug, ignore_errors=True)
+        return builder.write_pages(pages)
+
+    record("write", write_fresh)
+    record("build", builder.build, [guide], [site], 1, False)
+
+    builder.page_assets.cache_clear()
+    builder.guide_bundle.cache_clear()
+    tracemalloc.start()
+    builder.build([guide], [site], 1, False)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "corpus": name,
+        "chapters": len(sources),
+        "source_bytes": sum(len(raw.encode("utf-8")) for raw in raws),
+        "output_bytes": sum(len(data) for _, data in pages),
+        "stages": stages,
+        "peak_memory_bytes": peak,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=builder.ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def print_report(results: list[dict[str, object]], baseline: dict[str, dict[str, object]]) -> None:
+    for result in results:
+        stages = result["stages"]
+        before = baseline.get(str(result["corpus"]), {}).get("stages", {})
+        print(
+            f"{result['corpus']}: {result['chapters']} chapters, "
+            f"peak {int(result['peak_memory_bytes']) / 1_048_576:.1f} MiB"
+        )
+        for stage, seconds in stages.items():
+            line = f"  {stage:<17} {seconds * 1000:10.2f} ms"
+            if before.get(stage):
+                line += f"  ({seconds / before[stage]:.2f}x baseline)"
+            print(line)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the guide builder on synthetic and real corpora.")
+    parser.add_argument(
+        "--sizes",
+        default="10,100,1000",
+        help="Comma-separated synthetic chapter counts (default: 10,100,1000; up to 10000)",
+    )
+    parser.add_argument(
+        "--variants",
+        default=",".join(VARIANTS),
+        help=f"Comma-separated synthetic variants (default: {','.join(VARIANTS)})",
+    )
+    parser.add_argument("--no-real", action="store_true", help="Skip the real guides/sql-guide corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage, best time kept (default: 3)")
+    parser.add_argument(
+        "--output", type=Path, default=DEFAULT_OUTPUT, help=f"Results JSON path (default: {DEFAULT_OUTPUT})"
+    )
+    parser.add_argument("--baseline", type=Path, help="Earlier results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    variants = [variant.strip() for variant in args.variants.split(",") if variant.strip()]
+    unknown = sorted(set(variants) - set(VARIANTS))
+    if unknown:
+        raise SystemExit(f"Unknown variant(s): {', '.join(unknown)}")
+
+    baseline: dict[str, dict[str, object]] = {}
+    if args.baseline:
+        payload = json.loads(args.baseline.read_text(encoding="utf-8"))
+        baseline = {str(item["corpus"]): item for item in payload.get("results", [])}
+
+    results: list[dict[str, object]] = []
+    real_guides_dir = builder.GUIDES_DIR
+    with tempfile.TemporaryDirectory(prefix="guide-bench-") as scratch:
+        scratch_root = Path(scratch)
+        site = builder.Site("bench", scratch_root / "site")
+        # Keep the bench from touching the real metadata cache.
+        builder.CACHE_FILE = scratch_root / "cache" / "chapters.json"
+
+        if not args.no_real:
+            builder.GUIDES_DIR = real_guides_dir
+            real = builder.GUIDE_SETTINGS["sql-guide"]
+            results.append(bench_corpus("real-sql-guide", real, site, args.repeat))
+
+        builder.GUIDES_DIR = scratch_root / "guides"
+        for variant in variants:
+            for size in sizes:
+                guide = generate_corpus(builder.GUIDES_DIR, variant, size)
+                results.append(bench_corpus(f"{variant}-{size}", guide, site, args.repeat))
+                shutil.rmtree(guide.dir)
+        builder.GUIDES_DIR = real_guides_dir
+
+    payload = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+    print_report(results, baseline)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,156 @@
 #!/usr/bin/env python3
 """
-Generate styled HTML pages for sql-guide markdown notes.
-
-Outputs:
-- guides/sql-guide/index.html
-- guides/sql-guide/<chapter>.html for every chapter markdown file
+Generate styled HTML pages for every markdown-backed guide.
+
+A guide is any guides/<slug>/ directory containing chapter markdown files
+(guides/sql-guide today). The build runs as separate stages over all guides:
+discovery, markdown rendering, templating per output site, then writing.
+
+Outputs, for the root site and the codex/mirror copy:
+- guides/<slug>/index.html
+- guides/<slug>/<chapter>.html for every chapter markdown file
+- guides/<slug>/<chapter>.sections.json with the chapter's heading outline
+- search/index.json and search/terms-*.json (see search_index.py)
+- assets/bundles/<slug>.<hash>.css/.js: the minified stylesheets and scripts
+  every page of a guide loads; with --no-bundle, assets/**/<name>.<hash>.<ext>
+  copies of each of them instead
+- assets/manifest.json, naming those hashed files (see site_assets.py)
+- sitemap.xml and sitemap.json (see sitemap.py)
+- precache-manifest.json: content hashes of the guide pages and the assets
+  they load, for the sw.js service worker next to it
 """
 
 from __future__ import annotations
 
+import argparse
+import cProfile
+import hashlib
 import html
+import json
+import os
 import re
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
+from search_index import build_search_index, html_sections, markdown_sections, strip_markdown_markers
+from sitemap import HASH_LENGTH, SITE_URL, build_sitemap, content_hash
+from site_assets import (
+    BUNDLE_DIR,
+    MANIFEST_NAME,
+    bundle_css,
+    bundle_js,
+    bundle_name,
+    fingerprinted_name,
+    inlinable_css,
+    manifest_bytes,
+    stale_copies,
+)
+
 
 ROOT = Path(__file__).resolve().parents[1]
-SQL_DIR = ROOT / "guides" / "sql-guide"
-TOC_MD = SQL_DIR / "00_TABLE_OF_CONTENTS.md"
+GUIDES_DIR = ROOT / "guides"
+MIRROR_DIR = ROOT / "codex" / "mirror"
+SQL_DIR = GUIDES_DIR / "sql-guide"
+TOC_NAME = "00_TABLE_OF_CONTENTS.md"
+TOC_MD = SQL_DIR / TOC_NAME
+CACHE_FILE = ROOT / ".build-cache" / "chapters.json"
+CACHE_VERSION = 1
+PROFILE_FILE = ROOT / ".build-cache" / "profile" / "latest.json"
+INLINE_CSS_LIMIT = 14 * 1024
+PAGE_BUDGET = 100 * 1024
+SERVICE_WORKER = "sw.js"
+PRECACHE_NAME = "precache-manifest.json"
+PRECACHE_VERSION = 1
+
+AUTHOR = "Steven William Fry"
+OG_IMAGE = "assets/img/og-default.png"
+TWITTER_SITE = "@swfwtf"
+
+WATCH_INTERVAL = 0.5
+WATCH_DEBOUNCE = 0.3
+
+
+@dataclass(frozen=True)
+class Guide:
+    slug: str
+    name: str
+    description: str
+    intro: str
+    chapter_eyebrow: str
+    chapter_pills: tuple[str, ...] = ("study chapter",)
+    index_pills: tuple[str, ...] = ("markdown-backed",)
+    stylesheet: str = "assets/css/sql-guide.css"
+    fallback_title: str = "Lesson"
+    fallback_summary: str = "Detailed study notes."
+    page_budget: int = PAGE_BUDGET
+
+    @property
+    def dir(self) -> Path:
+        return GUIDES_DIR / self.slug
+
+    @property
+    def toc_md(self) -> Path:
+        return self.dir / TOC_NAME
+
+
+@dataclass(frozen=True)
+class Site:
+    name: str
+    root: Path
+    relative_urls: bool = False
+    extra_css: tuple[str, ...] = ()
+    extra_js: tuple[str, ...] = ()
+    fingerprint: bool = True
+    bundle: bool = True
+    inline_css: int = 0
+    minify_html: bool = False
+    service_worker: bool = True
+
+
+@dataclass(frozen=True)
+class Bundle:
+    css: str
+    js: str
+    css_path: str
+    js_path: str
+    inline_css: bool
+    source_requests: int
+    source_bytes: int
+
+
+GUIDE_SETTINGS: dict[str, Guide] = {
+    "sql-guide": Guide(
+        slug="sql-guide",
+        name="SQL Guide",
+        description="Oracle 19c and MySQL SQL study notes, converted to web chapters.",
+        intro=(
+            "Structured notes from my Oracle 19c SQL workshop study pass. Same site aesthetic, "
+            "less context switching, and no hunting through filenames at midnight."
+        ),
+        chapter_eyebrow="SQL Guide Chapter",
+        chapter_pills=("oracle 19c", "mysql notes", "study chapter"),
+        index_pills=("oracle + mysql", "markdown-backed"),
+        fallback_title="SQL Lesson",
+        fallback_summary="Detailed SQL study notes.",
+    ),
+}
+
+SITES: tuple[Site, ...] = (
+    Site("root", ROOT),
+    Site(
+        "mirror",
+        MIRROR_DIR,
+        relative_urls=True,
+        extra_css=("assets/css/codex-mirror.css",),
+        extra_js=("assets/js/codex-mirror.js",),
+    ),
+)
 
 
 LINK_RE = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
@@ -26,6 +160,13 @@ CODE_SPAN_RE = re.compile(r"`([^`]+)`")
 HEADING_RE = re.compile(r"^\s*(?:\ufeff)?(#{1,6})\s+(.+?)\s*$")
 UL_RE = re.compile(r"^\s*-\s+(.+?)\s*$")
 OL_RE = re.compile(r"^\s*(\d+)\.\s+(.+?)\s*$")
+BLOCK_BREAK_RE = re.compile(r"\n\s*\n")
+PRESERVED_HTML_RE = re.compile(r"(<(pre|textarea|script|style)\b.*?</\2\s*>)", re.DOTALL | re.IGNORECASE)
+BLOCK_TAG_RE = re.compile(
+    r" ?(</?(?:html|head|body|meta|link|title|nav|main|header|footer|article|section|div|p|h[1-6]|ul|ol|li"
+    r"|hr|br|table|thead|tbody|tr|th|td|pre|script|style|blockquote)\b[^>]*>) ?",
+    re.IGNORECASE,
+)
 
 
 def short_text(text: str, limit: int = 180) -> str:
@@ -35,14 +176,6 @@ def short_text(text: str, limit: int = 180) -> str:
     return clean[: limit - 1].rstrip() + "..."
 
 
-def strip_markdown_markers(text: str) -> str:
-    text = LINK_RE.sub(r"\1", text)
-    text = re.sub(r"`([^`]+)`", r"\1", text)
-    text = re.sub(r"\*\*(.+?)\*\*", r"\1", text)
-    text = re.sub(r"(?<!\*)\*(?!\s)(.+?)(?<!\s)\*(?!\*)", r"\1", text)
-    return re.sub(r"\s+", " ", text).strip()
-
-
 def format_inline(text: str) -> str:
     code_tokens: list[str] = []
 
@@ -73,10 +206,16 @@ def format_inline(text: str) -> str:
     return escaped
 
 
-def markdown_to_html(markdown_text: str) -> str:
+def slugify(text: str) -> str:
+    slug = re.sub(r"[^\w\s-]", "", strip_markdown_markers(text).lower())
+    return re.sub(r"[\s_-]+", "-", slug).strip("-") or "section"
+
+
+def markdown_to_html(markdown_text: str, outline: list[dict[str, object]] | None = None) -> str:
     lines = markdown_text.splitlines()
     out: list[str] = []
     para_lines: list[str] = []
+    heading_ids: set[str] = set()
 
     list_type: str | None = None  # "ul" or "ol"
     list_items: list[list[str]] = []
@@ -167,8 +306,20 @@ def markdown_to_html(markdown_text: str) -> str:
             flush_paragraph()
             flush_list()
             level = len(heading_match.group(1))
-            text = format_inline(heading_match.group(2).strip())
-            out.append(f"<h{level}>{text}</h{level}>")
+            source = heading_match.group(2).strip()
+            text = format_inline(source)
+            anchor = base = slugify(source)
+            suffix = 2
+            while anchor in heading_ids:
+                anchor = f"{base}-{suffix}"
+                suffix += 1
+            heading_ids.add(anchor)
+            if outline is not None and level in (2, 3):
+                outline.append({"level": level, "id": anchor, "title": strip_markdown_markers(source)})
+            out.append(
+                f'<h{level} id="{anchor}">{text}'
+                f'<a class="heading-anchor" href="#{anchor}" aria-hidden="true">#</a></h{level}>'
+            )
             continue
 
         if re.match(r"^\s*---+\s*$", line):
@@ -216,12 +367,12 @@ def markdown_to_html(markdown_text: str) -> str:
     return "\n".join(out)
 
 
-def extract_first_heading(markdown_text: str) -> str:
+def extract_first_heading(markdown_text: str, default: str = "SQL Lesson") -> str:
     for line in markdown_text.splitlines():
         match = HEADING_RE.match(line.lstrip("\ufeff"))
         if match:
             return match.group(2).strip()
-    return "SQL Lesson"
+    return default
 
 
 def strip_first_heading(markdown_text: str) -> str:
@@ -238,28 +389,26 @@ def strip_first_heading(markdown_text: str) -> str:
     return "\n".join(lines)
 
 
-def extract_summary(markdown_text: str) -> str:
-    blocks = re.split(r"\n\s*\n", markdown_text)
-    for block in blocks:
-        text = block.strip().lstrip("\ufeff")
-        if not text:
-            continue
-        if text.startswith("#"):
-            continue
-        if re.match(r"^[-*]\s+", text):
-            continue
-        if re.match(r"^\d+\.\s+", text):
-            continue
-        return short_text(strip_markdown_markers(text), 220)
-    return "Detailed SQL study notes."
+def extract_summary(markdown_text: str, default: str = "Detailed SQL study notes.") -> str:
+    # Walk blank-line separated blocks lazily; the summary is almost always
+    # one of the first few blocks, so there is no need to split the whole file.
+    start = 0
+    while True:
+        match = BLOCK_BREAK_RE.search(markdown_text, start)
+        text = markdown_text[start : match.start() if match else len(markdown_text)].strip().lstrip("\ufeff")
+        if text and not text.startswith("#") and not re.match(r"^([-*]|\d+\.)\s+", text):
+            return short_text(strip_markdown_markers(text), 220)
+        if not match:
+            return default
+        start = match.end()
 
 
-def parse_toc_entries() -> list[tuple[str, str]]:
-    if not TOC_MD.exists():
+def parse_toc_entries(toc_md: Path = TOC_MD) -> list[tuple[str, str]]:
+    if not toc_md.exists():
         return []
 
     entries: list[tuple[str, str]] = []
-    for line in TOC_MD.read_text(encoding="utf-8").splitlines():
+    for line in toc_md.read_text(encoding="utf-8").splitlines():
         line = line.lstrip("\ufeff")
         m = re.match(r"^\s*\d+\.\s+\[(.+?)\]\(([^)]+\.md)\)\s*$", line)
         if not m:
@@ -277,22 +426,94 @@ def chapter_sort_key(path: Path) -> tuple[int, str, str]:
     return (int(m.group(1)), m.group(2), path.stem.lower())
 
 
-def discover_chapters() -> list[dict[str, str]]:
-    chapter_map: dict[str, dict[str, str]] = {}
+def guide_for(slug: str) -> Guide:
+    if slug in GUIDE_SETTINGS:
+        return GUIDE_SETTINGS[slug]
+    name = slug.replace("-", " ").title()
+    return Guide(
+        slug=slug,
+        name=name,
+        description=f"{name} study notes, converted to web chapters.",
+        intro=f"{name} notes, rendered from markdown with the same site aesthetic.",
+        chapter_eyebrow=f"{name} Chapter",
+    )
+
 
-    for md in sorted(SQL_DIR.glob("*.md"), key=chapter_sort_key):
-        if md.name == "00_TABLE_OF_CONTENTS.md":
+def discover_guides() -> list[Guide]:
+    guides: list[Guide] = []
+    for guide_dir in sorted(GUIDES_DIR.iterdir()):
+        if not guide_dir.is_dir():
             continue
-        raw = md.read_text(encoding="utf-8").lstrip("\ufeff")
-        chapter_map[md.name] = {
-            "md_name": md.name,
+        if any(md.name != TOC_NAME for md in guide_dir.glob("*.md")):
+            guides.append(guide_for(guide_dir.name))
+    return guides
+
+
+def available_sites() -> list[Site]:
+    return [site for site in SITES if site.root.is_dir()]
+
+
+def load_metadata_cache() -> dict[str, dict[str, object]]:
+    try:
+        payload = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if not isinstance(payload, dict) or payload.get("version") != CACHE_VERSION:
+        return {}
+    entries = payload.get("chapters")
+    return entries if isinstance(entries, dict) else {}
+
+
+def save_metadata_cache(cache: dict[str, dict[str, object]]) -> None:
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"version": CACHE_VERSION, "chapters": cache}
+    CACHE_FILE.write_text(json.dumps(payload, ensure_ascii=False, indent=1, sort_keys=True), encoding="utf-8")
+
+
+def load_chapter(
+    md: Path,
+    guide: Guide = GUIDE_SETTINGS["sql-guide"],
+    cache: dict[str, dict[str, object]] | None = None,
+) -> dict[str, str]:
+    # Only index metadata is kept; chapter bodies are read again by
+    # render_body when (and only if) the chapter is rendered. With a cache,
+    # an unchanged mtime/size skips reading the file, and a touched file
+    # whose content hash still matches skips re-extracting title and summary.
+    key = f"{guide.slug}/{md.name}"
+    stat = md.stat()
+    entry = cache.get(key) if cache is not None else None
+    if entry and (entry.get("mtime_ns"), entry.get("size")) != (stat.st_mtime_ns, stat.st_size):
+        data = md.read_bytes()
+        digest = hashlib.sha1(data).hexdigest()
+        entry = entry if entry.get("sha1") == digest else None
+    elif entry is None:
+        data = md.read_bytes()
+        digest = hashlib.sha1(data).hexdigest()
+
+    if entry is None:
+        raw = data.decode("utf-8").lstrip("\ufeff")
+        entry = {
+            "sha1": digest,
             "label": md.stem.replace("_", " "),
-            "title": extract_first_heading(raw),
-            "summary": extract_summary(raw),
-            "raw": raw,
+            "title": extract_first_heading(raw, guide.fallback_title),
+            "summary": extract_summary(raw, guide.fallback_summary),
         }
-
-    toc_entries = parse_toc_entries()
+    entry.update({"mtime_ns": stat.st_mtime_ns, "size": stat.st_size})
+    if cache is not None:
+        cache[key] = entry
+
+    return {
+        "md_name": md.name,
+        "sha1": str(entry["sha1"]),
+        "label": str(entry["label"]),
+        "title": str(entry["title"]),
+        "summary": str(entry["summary"]),
+    }
+
+
+def order_chapters(
+    chapter_map: dict[str, dict[str, str]], toc_entries: list[tuple[str, str]]
+) -> list[dict[str, str]]:
     ordered: list[dict[str, str]] = []
     used: set[str] = set()
 
@@ -304,10 +525,10 @@ def discover_chapters() -> list[dict[str, str]]:
         ordered.append(meta)
         used.add(md_name)
 
-    for md_name, meta in chapter_map.items():
+    for md_name in sorted(chapter_map, key=lambda name: chapter_sort_key(Path(name))):
         if md_name in used:
             continue
-        ordered.append(meta.copy())
+        ordered.append(chapter_map[md_name].copy())
 
     for meta in ordered:
         meta["html_name"] = meta["md_name"][:-3] + ".html"
@@ -315,18 +536,238 @@ def discover_chapters() -> list[dict[str, str]]:
     return ordered
 
 
-def chapter_template(meta: dict[str, str], chapter_html: str, prev_link: str, next_link: str) -> str:
+def load_chapter_map(
+    guide: Guide, cache: dict[str, dict[str, object]] | None = None
+) -> dict[str, dict[str, str]]:
+    chapter_map: dict[str, dict[str, str]] = {}
+    for md in sorted(guide.dir.glob("*.md"), key=chapter_sort_key):
+        if md.name == TOC_NAME:
+            continue
+        chapter_map[md.name] = load_chapter(md, guide, cache)
+    return chapter_map
+
+
+def discover_chapters(
+    guide: Guide = GUIDE_SETTINGS["sql-guide"], cache: dict[str, dict[str, object]] | None = None
+) -> list[dict[str, str]]:
+    return order_chapters(load_chapter_map(guide, cache), parse_toc_entries(guide.toc_md))
+
+
+def site_url(site: Site, path: str) -> str:
+    # Guide pages live two levels deep (guides/<slug>/), which is what the
+    # mirror's relative URLs are resolved against.
+    return ("../../" if site.relative_urls else "/") + path
+
+
+@lru_cache(maxsize=None)
+def fingerprinted_asset(site: Site, path: str) -> str:
+    source = site.root / path
+    if not site.fingerprint or not source.is_file():
+        return path
+    return fingerprinted_name(path, source.read_bytes())
+
+
+def asset_url(site: Site, path: str) -> str:
+    return site_url(site, fingerprinted_asset(site, path))
+
+
+def asset_sources(guide: Guide, site: Site) -> tuple[list[str], list[str]]:
+    return ["assets/css/site.css", guide.stylesheet, *site.extra_css], ["assets/js/site.js", *site.extra_js]
+
+
+@lru_cache(maxsize=None)
+def guide_bundle(guide: Guide, site: Site) -> Bundle:
+    # Chapter and index pages of a guide load the same assets, so one bundle
+    # per guide and site covers both page types.
+    stylesheets, scripts = asset_sources(guide, site)
+    existing = [site.root / path for path in (*stylesheets, *scripts) if (site.root / path).is_file()]
+    css_sources = [path.read_text(encoding="utf-8") for path in existing if path.suffix == ".css"]
+    js_sources = [path.read_text(encoding="utf-8") for path in existing if path.suffix == ".js"]
+    css = bundle_css(css_sources)
+    js = bundle_js(js_sources) if js_sources else ""
+    css_bytes = css.encode("utf-8")
+    return Bundle(
+        css=css,
+        js=js,
+        css_path=bundle_name(guide.slug, ".css", css_bytes, site.fingerprint),
+        js_path=bundle_name(guide.slug, ".js", js.encode("utf-8"), site.fingerprint),
+        inline_css=0 < len(css_bytes) <= site.inline_css and inlinable_css(css),
+        source_requests=len(css_sources) + len(js_sources),
+        source_bytes=sum(len(source.encode("utf-8")) for source in css_sources + js_sources),
+    )
+
+
+def bundle_pages(guides: list[Guide], sites: list[Site]) -> list[tuple[Path, bytes]]:
+    pages: list[tuple[Path, bytes]] = []
+    for site in sites:
+        if not site.bundle:
+            continue
+        for guide in guides:
+            bundle = guide_bundle(guide, site)
+            if bundle.css and not bundle.inline_css:
+                pages.append((site.root / bundle.css_path, bundle.css.encode("utf-8")))
+            if bundle.js:
+                pages.append((site.root / bundle.js_path, bundle.js.encode("utf-8")))
+    return pages
+
+
+def asset_pages(guides: list[Guide], sites: list[Site]) -> list[tuple[Path, bytes]]:
+    """Return the bundles, or the hashed asset copies, the guides' pages link, and each site's manifest."""
+    pages = bundle_pages(guides, sites)
+    for site in sites:
+        if not site.fingerprint:
+            continue
+        linked: dict[str, str] = {}
+        for guide in guides:
+            if site.bundle:
+                bundle = guide_bundle(guide, site)
+                if bundle.css and not bundle.inline_css:
+                    linked[f"{BUNDLE_DIR}/{guide.slug}.css"] = bundle.css_path
+                if bundle.js:
+                    linked[f"{BUNDLE_DIR}/{guide.slug}.js"] = bundle.js_path
+                continue
+            for path in (path for paths in asset_sources(guide, site) for path in paths):
+                fingerprinted = fingerprinted_asset(site, path)
+                if fingerprinted != path and path not in linked:
+                    linked[path] = fingerprinted
+                    pages.append((site.root / fingerprinted, (site.root / path).read_bytes()))
+        pages.append((site.root / MANIFEST_NAME, manifest_bytes(site.root, linked)))
+    return pages
+
+
+def bundle_report(guides: list[Guide], sites: list[Site]) -> list[dict[str, object]]:
+    report: list[dict[str, object]] = []
+    for site in sites:
+        if not site.bundle:
+            continue
+        for guide in guides:
+            bundle = guide_bundle(guide, site)
+            css_bytes = len(bundle.css.encode("utf-8"))
+            report.append(
+                {
+                    "site": site.name,
+                    "guide": guide.slug,
+                    "requests_before": bundle.source_requests,
+                    "requests_after": bool(bundle.css and not bundle.inline_css) + bool(bundle.js),
+                    "bytes_before": bundle.source_bytes,
+                    "bytes_after": css_bytes + len(bundle.js.encode("utf-8")),
+                    "inline_css_bytes": css_bytes if bundle.inline_css else 0,
+                }
+            )
+    return report
+
+
+def linked_assets(guide: Guide, site: Site) -> list[str]:
+    if site.bundle:
+        bundle = guide_bundle(guide, site)
+        return [path for path, data in ((bundle.css_path, bundle.css), (bundle.js_path, bundle.js)) if data]
+    return [fingerprinted_asset(site, path) for paths in asset_sources(guide, site) for path in paths]
+
+
+def uses_service_worker(site: Site) -> bool:
+    return site.service_worker and (site.root / SERVICE_WORKER).is_file()
+
+
+@lru_cache(maxsize=None)
+def page_assets(guide: Guide, site: Site) -> tuple[str, str]:
+    css, js = asset_tags(guide, site)
+    if uses_service_worker(site):
+        js += (
+            "\n<script>if ('serviceWorker' in navigator) "
+            f"navigator.serviceWorker.register('{site_url(site, SERVICE_WORKER)}');</script>"
+        )
+    return css, js
+
+
+def asset_tags(guide: Guide, site: Site) -> tuple[str, str]:
+    if site.bundle:
+        bundle = guide_bundle(guide, site)
+        css = js = ""
+        if bundle.inline_css:
+            css = f"<style>{bundle.css}</style>"
+        elif bundle.css:
+            css = f'<link rel="stylesheet" href="{site_url(site, bundle.css_path)}">'
+        if bundle.js:
+            js = f'<script defer src="{site_url(site, bundle.js_path)}"></script>'
+        return css, js
+    stylesheets, scripts = asset_sources(guide, site)
+    css = "\n".join(f'<link rel="stylesheet" href="{asset_url(site, path)}">' for path in stylesheets)
+    js = "\n".join(f'<script defer src="{asset_url(site, path)}"></script>' for path in scripts)
+    return css, js
+
+
+def seo_tags(title: str, description: str, path: str, structured: dict[str, object]) -> str:
+    # title and description arrive unescaped; canonical URLs always name the root site.
+    url = f"{SITE_URL}/{path}"
+    image = f"{SITE_URL}/{OG_IMAGE}"
+    kind = "article" if structured["@type"] == "Article" else "website"
+    meta = [
+        f'<link rel="canonical" href="{url}">',
+        f'<meta property="og:title" content="{html.escape(title)}">',
+        f'<meta property="og:description" content="{html.escape(description)}">',
+        f'<meta property="og:type" content="{kind}">',
+        f'<meta property="og:url" content="{url}">',
+        f'<meta property="og:image" content="{image}">',
+        '<meta name="twitter:card" content="summary_large_image">',
+        f'<meta name="twitter:title" content="{html.escape(title)}">',
+        f'<meta name="twitter:description" content="{html.escape(description)}">',
+        f'<meta name="twitter:image" content="{image}">',
+        f'<meta name="twitter:site" content="{TWITTER_SITE}">',
+    ]
+    data = json.dumps(
+        {"@context": "https://schema.org", **structured}, ensure_ascii=False, separators=(",", ":")
+    ).replace("</", "<\\/")
+    return (
+        f"<!-- SEO META START --> {' '.join(meta)} <!-- SEO META END --> "
+        f'<!-- SEO STRUCTURED DATA START --> <script type="application/ld+json">{data}</script> '
+        "<!-- SEO STRUCTURED DATA END -->"
+    )
+
+
+def remove_stale_assets(sites: list[Site]) -> None:
+    # Runs after the new manifests are written.
+    for site in sites:
+        if site.fingerprint:
+            for path in stale_copies(site.root):
+                path.unlink(missing_ok=True)
+
+
+def chapter_template(
+    guide: Guide, site: Site, meta: dict[str, str], chapter_html: str, prev_link: str, next_link: str
+) -> str:
     title = html.escape(meta["title"])
-    desc = html.escape(short_text(meta["summary"], 155))
+    summary = short_text(meta["summary"], 155)
+    desc = html.escape(summary)
+    css, js = page_assets(guide, site)
+    page_title = f"{meta['title']} - {guide.name} - swf.wtf"
+    path = f"guides/{guide.slug}/{meta['html_name']}"
+    author = {"@type": "Person", "name": AUTHOR}
+    seo = seo_tags(
+        page_title,
+        summary,
+        path,
+        {
+            "@type": "Article",
+            "headline": page_title,
+            "description": summary,
+            "url": f"{SITE_URL}/{path}",
+            "author": author,
+            "publisher": author,
+        },
+    )
+    pills = "\n".join(
+        f'      <span class="sql-pill">{html.escape(pill)}</span>' for pill in guide.chapter_pills
+    )
     return f"""<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8">
+<link rel="icon" href="{site_url(site, "favicon.svg")}" type="image/svg+xml">
 <meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>{title} - SQL Guide - swf.wtf</title>
+<title>{title} - {html.escape(guide.name)} - swf.wtf</title>
 <meta name="description" content="{desc}">
-<link rel="stylesheet" href="/assets/css/site.css">
-<link rel="stylesheet" href="/assets/css/sql-guide.css">
+{seo}
+{css}
 </head>
 <body>
 
@@ -334,23 +775,22 @@ def chapter_template(meta: dict[str, str], chapter_html: str, prev_link: str, ne
 
 <nav>
   <div class="inner">
-    <a href="/" class="logo">swf.wtf</a>
-    <a href="/guides/sql-guide/">&larr; sql guide</a>
+    <a href="{site_url(site, "")}" class="logo">swf.wtf</a>
+    <a href="{site_url(site, f"guides/{guide.slug}/")}">&larr; {html.escape(guide.name.lower())}</a>
   </div>
 </nav>
 
 <main class="sql-page">
   <header class="sql-header">
-    <div class="sql-eyebrow">SQL Guide Chapter</div>
+    <div class="sql-eyebrow">{html.escape(guide.chapter_eyebrow)}</div>
     <h1>{title}</h1>
     <p>{html.escape(meta["summary"])}</p>
     <div class="sql-meta">
-      <span class="sql-pill">oracle 19c</span>
-      <span class="sql-pill">mysql notes</span>
-      <span class="sql-pill">study chapter</span>
+{pills}
     </div>
   </header>
 
+{meta["outline_html"]}
   <article class="chapter">
 {chapter_html}
   </article>
@@ -361,17 +801,17 @@ def chapter_template(meta: dict[str, str], chapter_html: str, prev_link: str, ne
     <a href="{next_link}">next &rarr;</a>
   </div>
 
-  <div class="sql-footer">// sql-guide generated from markdown notes</div>
+  <div class="sql-footer">// {guide.slug} generated from markdown notes</div>
 </main>
 
-<script defer src="/assets/js/site.js"></script>
+{js}
 
 </body>
 </html>
 """
 
 
-def index_template(chapters: list[dict[str, str]]) -> str:
+def index_template(guide: Guide, site: Site, chapters: list[dict[str, str]]) -> str:
     cards: list[str] = []
     for meta in chapters:
         title = html.escape(meta["label"])
@@ -387,16 +827,41 @@ def index_template(chapters: list[dict[str, str]]) -> str:
         )
 
     card_html = "\n".join(cards)
+    css, js = page_assets(guide, site)
+    pills = "\n".join(
+        f'      <span class="sql-pill">{html.escape(pill)}</span>'
+        for pill in (f"{len(chapters)} chapters", *guide.index_pills)
+    )
+    links: list[str] = []
+    if guide.toc_md.exists():
+        links.append(f'    <a href="{TOC_NAME}">Table of contents (.md)</a>')
+    if chapters:
+        links.append(f'    <a href="{chapters[0]["md_name"]}">Raw notes folder</a>')
+    link_html = "\n".join(links)
+    page_title = f"{guide.name} - swf.wtf"
+    path = f"guides/{guide.slug}/"
+    seo = seo_tags(
+        page_title,
+        guide.description,
+        path,
+        {
+            "@type": "CollectionPage",
+            "name": page_title,
+            "url": f"{SITE_URL}/{path}",
+            "description": guide.description,
+        },
+    )
 
     return f"""<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8">
+<link rel="icon" href="{site_url(site, "favicon.svg")}" type="image/svg+xml">
 <meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>SQL Guide - swf.wtf</title>
-<meta name="description" content="Oracle 19c and MySQL SQL study notes, converted to web chapters.">
-<link rel="stylesheet" href="/assets/css/site.css">
-<link rel="stylesheet" href="/assets/css/sql-guide.css">
+<title>{html.escape(guide.name)} - swf.wtf</title>
+<meta name="description" content="{html.escape(guide.description)}">
+{seo}
+{css}
 </head>
 <body>
 
@@ -404,20 +869,18 @@ def index_template(chapters: list[dict[str, str]]) -> str:
 
 <nav>
   <div class="inner">
-    <a href="/" class="logo">swf.wtf</a>
-    <a href="/">&larr; home</a>
+    <a href="{site_url(site, "")}" class="logo">swf.wtf</a>
+    <a href="{site_url(site, "")}">&larr; home</a>
   </div>
 </nav>
 
 <main class="sql-page">
   <header class="sql-header">
     <div class="sql-eyebrow">Study Notes</div>
-    <h1>SQL Guide</h1>
-    <p>Structured notes from my Oracle 19c SQL workshop study pass. Same site aesthetic, less context switching, and no hunting through filenames at midnight.</p>
+    <h1>{html.escape(guide.name)}</h1>
+    <p>{html.escape(guide.intro)}</p>
     <div class="sql-meta">
-      <span class="sql-pill">{len(chapters)} chapters</span>
-      <span class="sql-pill">oracle + mysql</span>
-      <span class="sql-pill">markdown-backed</span>
+{pills}
     </div>
   </header>
 
@@ -428,45 +891,648 @@ def index_template(chapters: list[dict[str, str]]) -> str:
   </section>
 
   <div class="sql-links">
-    <a href="00_TABLE_OF_CONTENTS.md">Table of contents (.md)</a>
-    <a href="01_Course_Introduction.md">Raw notes folder</a>
+{link_html}
   </div>
 
   <div class="sql-footer">// generated by scripts/build_sql_guide.py</div>
 </main>
 
-<script defer src="/assets/js/site.js"></script>
+{js}
 
 </body>
 </html>
 """
 
 
-def write_chapters(chapters: list[dict[str, str]]) -> None:
-    for idx, meta in enumerate(chapters):
-        raw = meta["raw"]
-        body_md = strip_first_heading(raw)
-        body_html = markdown_to_html(body_md)
-        indented_body = "\n".join(f"    {line}" for line in body_html.splitlines())
+def outline_template(outline: list[dict[str, object]]) -> str:
+    if not outline:
+        return ""
+    items = "\n".join(
+        f'      <li class="outline-h{entry["level"]}">'
+        f'<a href="#{entry["id"]}">{html.escape(str(entry["title"]))}</a></li>'
+        for entry in outline
+    )
+    return f"""  <nav class="chapter-outline" aria-label="On this page">
+    <div class="sql-eyebrow">On this page</div>
+    <ol>
+{items}
+    </ol>
+  </nav>
+"""
+
+
+def minify_html(page_html: str) -> str:
+    # Whitespace runs collapse to one space, and disappear next to block-level
+    # tags where the browser ignores them anyway. pre/textarea/script/style
+    # contents are copied verbatim so code blocks keep their layout.
+    parts: list[str] = []
+    chunks = PRESERVED_HTML_RE.split(page_html)
+    # split() yields text, preserved element, tag name, text, ...
+    for idx in range(0, len(chunks), 3):
+        text = re.sub(r"\s+", " ", chunks[idx])
+        parts.append(BLOCK_TAG_RE.sub(r"\1", text))
+        if idx + 1 < len(chunks):
+            parts.append(chunks[idx + 1])
+    return "".join(parts).strip() + "\n"
+
 
-        prev_link = chapters[idx - 1]["html_name"] if idx > 0 else "index.html"
-        next_link = chapters[idx + 1]["html_name"] if idx < len(chapters) - 1 else "index.html"
+def page_bytes(site: Site, page_html: str) -> bytes:
+    return (minify_html(page_html) if site.minify_html else page_html).encode("utf-8")
 
-        page_html = chapter_template(meta, indented_body, prev_link, next_link)
-        (SQL_DIR / meta["html_name"]).write_text(page_html, encoding="utf-8")
+
+def budget_violations(guide: Guide, pages: list[tuple[Path, bytes]]) -> list[str]:
+    if guide.page_budget <= 0:
+        return []
+    return [
+        f"{path.relative_to(ROOT) if path.is_relative_to(ROOT) else path}: "
+        f"{len(data)} bytes (budget {guide.page_budget})"
+        for path, data in pages
+        if path.suffix == ".html" and len(data) > guide.page_budget
+    ]
+
+
+def indent_html(body_html: str, prefix: str = "    ") -> str:
+    # Continuation lines of a <pre> block are content, not markup, so only
+    # the line that opens the block is indented.
+    lines: list[str] = []
+    in_pre = False
+    for line in body_html.splitlines():
+        lines.append(line if in_pre else prefix + line)
+        if "<pre" in line or in_pre:
+            in_pre = "</pre>" not in line
+    return "\n".join(lines)
 
 
-def write_index(chapters: list[dict[str, str]]) -> None:
-    (SQL_DIR / "index.html").write_text(index_template(chapters), encoding="utf-8")
+RENDERED_FIELDS = ("body_html", "outline_html", "outline", "sections")
+
+
+def render_body(md: Path, title: str) -> tuple[str, str, str, str]:
+    # Headings get their ids and land in the outline during the single
+    # markdown pass; the outline is returned as page HTML and sidecar JSON,
+    # alongside the anchored text sections the search index is built from.
+    body_md = strip_first_heading(md.read_text(encoding="utf-8").lstrip("\ufeff"))
+    outline: list[dict[str, object]] = []
+    body_html = markdown_to_html(body_md, outline)
+    indented_body = indent_html(body_html)
+    sections = markdown_sections(title, body_md, [str(entry["id"]) for entry in outline])
+    return (
+        indented_body,
+        outline_template(outline),
+        json.dumps(outline, ensure_ascii=False),
+        json.dumps(sections, ensure_ascii=False),
+    )
+
+
+def timed_render_body(md: Path, title: str) -> tuple[float, tuple[str, str, str, str]]:
+    started = time.perf_counter()
+    rendered = render_body(md, title)
+    return time.perf_counter() - started, rendered
+
+
+def render_bodies(guide: Guide, chapters: list[dict[str, str]], jobs: int = 1) -> list[float]:
+    paths = [guide.dir / meta["md_name"] for meta in chapters]
+    titles = [meta["title"] for meta in chapters]
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunksize = max(1, len(paths) // (jobs * 4))
+            results = list(pool.map(timed_render_body, paths, titles, chunksize=chunksize))
+    else:
+        results = [timed_render_body(path, title) for path, title in zip(paths, titles)]
+    for meta, (_, rendered) in zip(chapters, results):
+        meta.update(zip(RENDERED_FIELDS, rendered))
+    return [elapsed for elapsed, _ in results]
+
+
+def chapter_pages(
+    guide: Guide, chapters: list[dict[str, str]], idx: int, sites: list[Site]
+) -> list[tuple[Path, bytes]]:
+    meta = chapters[idx]
+    prev_link = chapters[idx - 1]["html_name"] if idx > 0 else "index.html"
+    next_link = chapters[idx + 1]["html_name"] if idx < len(chapters) - 1 else "index.html"
+
+    sidecar = {
+        "path": f"/guides/{guide.slug}/{meta['html_name']}",
+        "title": meta["title"],
+        "sections": json.loads(meta["outline"]),
+    }
+    sidecar_bytes = json.dumps(sidecar, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    sidecar_name = meta["md_name"][:-3] + ".sections.json"
+
+    pages: list[tuple[Path, bytes]] = []
+    for site in sites:
+        guide_dir = site.root / "guides" / guide.slug
+        page_html = chapter_template(guide, site, meta, meta["body_html"], prev_link, next_link)
+        pages.append((guide_dir / meta["html_name"], page_bytes(site, page_html)))
+        pages.append((guide_dir / sidecar_name, sidecar_bytes))
+    return pages
+
+
+def index_pages(guide: Guide, chapters: list[dict[str, str]], sites: list[Site]) -> list[tuple[Path, bytes]]:
+    pages: list[tuple[Path, bytes]] = []
+    for site in sites:
+        page_html = index_template(guide, site, chapters)
+        pages.append((site.root / "guides" / guide.slug / "index.html", page_bytes(site, page_html)))
+    return pages
+
+
+def source_pages(guide: Guide, names: list[str], sites: list[Site]) -> list[tuple[Path, bytes]]:
+    # Sites other than the root serve their own copy of the markdown sources
+    # behind the "view source markdown" links.
+    pages: list[tuple[Path, bytes]] = []
+    for name in names:
+        source = guide.dir / name
+        if not source.exists():
+            continue
+        data = source.read_bytes()
+        for site in sites:
+            if site.root != ROOT:
+                pages.append((site.root / "guides" / guide.slug / name, data))
+    return pages
+
+
+def search_pages(
+    plans: list[tuple[Guide, list[dict[str, str]]]], sites: list[Site]
+) -> list[tuple[Path, bytes]]:
+    documents = [
+        (
+            f"/guides/{guide.slug}/{meta['html_name']}",
+            meta["title"],
+            [tuple(section) for section in json.loads(meta["sections"])],
+        )
+        for guide, chapters in plans
+        for meta in chapters
+    ]
+    markdown_slugs = {guide.slug for guide in discover_guides()}
+
+    pages: list[tuple[Path, bytes]] = []
+    for site in sites:
+        # Hand-maintained guide pages differ between the root site and the
+        # mirror, so each site indexes its own copy.
+        site_documents = list(documents)
+        for page in sorted((site.root / "guides").glob("*/index.html")):
+            if page.parent.name in markdown_slugs:
+                continue
+            title, sections = html_sections(page)
+            site_documents.append((f"/guides/{page.parent.name}/index.html", title, sections))
+        for rel_path, data in build_search_index(site_documents).items():
+            pages.append((site.root / rel_path, data))
+    return pages
+
+
+def sitemap_pages(
+    plans: list[tuple[Guide, list[dict[str, str]]]], sites: list[Site]
+) -> list[tuple[Path, bytes]]:
+    # Chapters are hashed by the sha1 load_chapter already keeps, so no
+    # markdown is read again here.
+    generated: dict[str, str] = {}
+    for guide, chapters in plans:
+        for meta in chapters:
+            generated[f"/guides/{guide.slug}/{meta['html_name']}"] = meta["sha1"][:HASH_LENGTH]
+        # The index page is built from the chapter cards, not one source file.
+        cards = json.dumps(index_fields(chapters), ensure_ascii=False).encode("utf-8")
+        generated[f"/guides/{guide.slug}/"] = content_hash(cards)
+    prefixes = [f"/guides/{guide.slug}/" for guide, _ in plans]
+    today = datetime.now(timezone.utc).date().isoformat()
+
+    # Every URL names the root site, so the mirror gets the root site's
+    # sitemap rather than one of its own that sync_mirror.py would overwrite.
+    files = build_sitemap(ROOT, generated, prefixes, today)
+    return [(site.root / rel_path, data) for site in sites for rel_path, data in files.items()]
+
+
+def precache_pages(
+    plans: list[tuple[Guide, list[dict[str, str]]]], sites: list[Site]
+) -> list[tuple[Path, bytes]]:
+    # Hashes the files on disk, so it runs once the pages have been written.
+    # Paths are relative to the site root, which is the service worker scope.
+    pages: list[tuple[Path, bytes]] = []
+    for site in sites:
+        if not uses_service_worker(site):
+            continue
+        paths: list[str] = []
+        for guide, chapters in plans:
+            paths.append(f"guides/{guide.slug}/index.html")
+            paths.extend(f"guides/{guide.slug}/{meta['html_name']}" for meta in chapters)
+            paths.extend(linked_assets(guide, site))
+        urls = {
+            path: content_hash((site.root / path).read_bytes())
+            for path in dict.fromkeys(paths)
+            if (site.root / path).is_file()
+        }
+        payload = {"version": PRECACHE_VERSION, "urls": urls}
+        pages.append((site.root / PRECACHE_NAME, json.dumps(payload, separators=(",", ":")).encode("utf-8")))
+    return pages
 
 
-def main() -> None:
-    chapters = discover_chapters()
-    if not chapters:
-        raise SystemExit("No chapter markdown files found in guides/sql-guide.")
-    write_chapters(chapters)
-    write_index(chapters)
-    print(f"Generated {len(chapters)} chapter pages and guides/sql-guide/index.html")
+def write_pages(pages: list[tuple[Path, bytes]]) -> tuple[int, int]:
+    written = 0
+    written_bytes = 0
+    for path, data in pages:
+        try:
+            if path.read_bytes() == data:
+                continue
+        except FileNotFoundError:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        written += 1
+        written_bytes += len(data)
+    return written, written_bytes
+
+
+def cpu_seconds() -> float:
+    # Includes reaped worker processes, so --jobs renders are counted too.
+    times = os.times()
+    return time.process_time() + times.children_user + times.children_system
+
+
+@contextmanager
+def profile_stage(profile: dict[str, object] | None, name: str) -> Iterator[None]:
+    if profile is None:
+        yield
+        return
+    wall_started, cpu_started = time.perf_counter(), cpu_seconds()
+    try:
+        yield
+    finally:
+        stages = profile.setdefault("stages", {})
+        stages[name] = {
+            "wall_seconds": round(time.perf_counter() - wall_started, 6),
+            "cpu_seconds": round(cpu_seconds() - cpu_started, 6),
+        }
+
+
+def build(
+    guides: list[Guide],
+    sites: list[Site],
+    jobs: int = 1,
+    use_cache: bool = True,
+    profile: dict[str, object] | None = None,
+    render_profile: Path | None = None,
+    plans: list[tuple[Guide, list[dict[str, str]]]] | None = None,
+) -> tuple[int, int]:
+    """Run every build stage; stage timings are recorded into profile when given.
+
+    render_profile dumps cProfile stats for the render stage. cProfile cannot
+    see into worker processes, so the render stage runs in-process then.
+    Nothing is written when a page exceeds its guide's page_budget. Each
+    guide's ordered, rendered chapters are appended to plans when given.
+    """
+    if plans is None:
+        plans = []
+    with profile_stage(profile, "discover"):
+        cache = load_metadata_cache() if use_cache else {}
+        plans.extend((guide, discover_chapters(guide, cache)) for guide in guides)
+        save_metadata_cache(cache)
+
+    profiler = cProfile.Profile() if render_profile else None
+    render_times: list[tuple[float, str, str]] = []
+    with profile_stage(profile, "render"):
+        if profiler:
+            profiler.enable()
+        for guide, chapters in plans:
+            elapsed = render_bodies(guide, chapters, 1 if profiler else jobs)
+            render_times.extend(zip(elapsed, [guide.slug] * len(chapters), [m["md_name"] for m in chapters]))
+        if profiler:
+            profiler.disable()
+            render_profile.parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(str(render_profile))
+
+    pages: list[tuple[Path, bytes]] = []
+    with profile_stage(profile, "assets"):
+        pages.extend(asset_pages(guides, sites))
+
+    violations: list[str] = []
+    with profile_stage(profile, "template"):
+        for guide, chapters in plans:
+            guide_pages = index_pages(guide, chapters, sites)
+            for idx in range(len(chapters)):
+                guide_pages.extend(chapter_pages(guide, chapters, idx, sites))
+            violations.extend(budget_violations(guide, guide_pages))
+            pages.extend(guide_pages)
+            names = [meta["md_name"] for meta in chapters]
+            pages.extend(source_pages(guide, [TOC_NAME, *names], sites))
+    if violations:
+        raise SystemExit("Page size budget exceeded:\n  " + "\n  ".join(violations))
+
+    with profile_stage(profile, "search"):
+        pages.extend(search_pages(plans, sites))
+
+    with profile_stage(profile, "sitemap"):
+        pages.extend(sitemap_pages(plans, sites))
+
+    with profile_stage(profile, "write"):
+        written, written_bytes = write_pages(pages)
+        remove_stale_assets(sites)
+        precache = precache_pages(plans, sites)
+        precache_written, precache_bytes = write_pages(precache)
+        pages.extend(precache)
+        written += precache_written
+        written_bytes += precache_bytes
+
+    chapter_count = sum(len(chapters) for _, chapters in plans)
+    if profile is not None:
+        render_times.sort(reverse=True)
+        profile.update(
+            {
+                "chapters": chapter_count,
+                "pages": len(pages),
+                "output_bytes": sum(len(data) for _, data in pages),
+                "files_written": written,
+                "bytes_written": written_bytes,
+                "bundles": bundle_report(guides, sites),
+                "slowest_chapters": [
+                    {"guide": slug, "chapter": name, "render_seconds": round(elapsed, 6)}
+                    for elapsed, slug, name in render_times
+                ],
+            }
+        )
+    return chapter_count, written
+
+
+def snapshot_sources(guides: list[Guide]) -> dict[tuple[str, str], tuple[int, int]]:
+    stamps: dict[tuple[str, str], tuple[int, int]] = {}
+    for guide in guides:
+        for md in guide.dir.glob("*.md"):
+            try:
+                stat = md.stat()
+            except FileNotFoundError:
+                continue
+            stamps[(guide.slug, md.name)] = (stat.st_mtime_ns, stat.st_size)
+    return stamps
+
+
+def neighbor_links(chapters: list[dict[str, str]]) -> dict[str, tuple[str, str]]:
+    names = [meta["md_name"] for meta in chapters]
+    links: dict[str, tuple[str, str]] = {}
+    for idx, name in enumerate(names):
+        prev_name = names[idx - 1] if idx > 0 else ""
+        next_name = names[idx + 1] if idx < len(names) - 1 else ""
+        links[name] = (prev_name, next_name)
+    return links
+
+
+def index_fields(chapters: list[dict[str, str]]) -> list[tuple[str, str, str, str]]:
+    return [(m["md_name"], m["label"], m["title"], m["summary"]) for m in chapters]
+
+
+def watch(
+    guides: list[Guide], sites: list[Site], interval: float = WATCH_INTERVAL, debounce: float = WATCH_DEBOUNCE
+) -> None:
+    # The first pass is a full build(). After that, chapter metadata stays in
+    # memory between rebuilds: a burst of saves only re-reads the edited
+    # files, re-renders pages whose source or prev/next links changed, and
+    # rewrites index.html only when its card fields differ. Rendered fields
+    # are stored back into chapter_maps so unchanged chapters keep their
+    # bodies, outlines and search sections across reorderings.
+    plans: list[tuple[Guide, list[dict[str, str]]]] = []
+    build(guides, sites, plans=plans)
+    cache = load_metadata_cache()
+    by_slug = {guide.slug: guide for guide in guides}
+    toc_entries = {guide.slug: parse_toc_entries(guide.toc_md) for guide in guides}
+    chapters = {guide.slug: items for guide, items in plans}
+    # A chapter's TOC label is set again by every order_chapters() call.
+    chapter_maps = {
+        slug: {
+            meta["md_name"]: {key: value for key, value in meta.items() if key != "label"} for meta in items
+        }
+        for slug, items in chapters.items()
+    }
+
+    stamps = snapshot_sources(guides)
+    pending: set[tuple[str, str]] = set()
+    last_change = 0.0
+    total = sum(len(items) for items in chapters.values())
+    print(f"Watching {len(guides)} guide(s) for changes ({total} chapters, Ctrl+C to stop)")
+
+    try:
+        while True:
+            time.sleep(interval)
+            current = snapshot_sources(guides)
+            changed = {
+                key for key in current.keys() | stamps.keys() if current.get(key) != stamps.get(key)
+            }
+            stamps = current
+            if changed:
+                pending |= changed
+                last_change = time.monotonic()
+                continue
+            if not pending or time.monotonic() - last_change < debounce:
+                continue
+
+            rendered: list[str] = []
+            for slug in sorted({slug for slug, _ in pending}):
+                guide = by_slug[slug]
+                names = {name for key_slug, name in pending if key_slug == slug}
+                # A half-written or mis-encoded file keeps its last good pages; its
+                # next save changes the stamp and retries it.
+                failed: set[str] = set()
+                for name in names:
+                    md = guide.dir / name
+                    try:
+                        if name == TOC_NAME:
+                            toc_entries[slug] = parse_toc_entries(guide.toc_md)
+                        elif md.exists():
+                            meta = load_chapter(md, guide, cache)
+                            render_bodies(guide, [meta])
+                            chapter_maps[slug][name] = meta
+                        elif chapter_maps[slug].pop(name, None) is not None:
+                            for site in sites:
+                                stale = [name[:-3] + ".html", name[:-3] + ".sections.json"]
+                                if site.root != ROOT:
+                                    stale.append(name)  # the copy written by source_pages()
+                                for stale_name in stale:
+                                    (site.root / "guides" / slug / stale_name).unlink(missing_ok=True)
+                    except (OSError, UnicodeDecodeError) as error:
+                        print(f"Skipped {slug}/{name}: {error}")
+                        failed.add(name)
+                names -= failed
+
+                updated = order_chapters(chapter_maps[slug], toc_entries[slug])
+                old_links = neighbor_links(chapters[slug])
+                new_links = neighbor_links(updated)
+                dirty = [
+                    idx
+                    for idx, meta in enumerate(updated)
+                    if meta["md_name"] in names
+                    or old_links.get(meta["md_name"]) != new_links[meta["md_name"]]
+                ]
+                pages = [page for idx in dirty for page in chapter_pages(guide, updated, idx, sites)]
+                for violation in budget_violations(guide, pages):
+                    print(f"Over budget: {violation}")
+                rendered.extend(f"{slug}/{updated[idx]['html_name']}" for idx in dirty)
+                if index_fields(updated) != index_fields(chapters[slug]):
+                    pages.extend(index_pages(guide, updated, sites))
+                    rendered.append(f"{slug}/index.html")
+                pages.extend(source_pages(guide, sorted(names), sites))
+                write_pages(pages)
+                chapters[slug] = updated
+
+            plans = [(guide, chapters[guide.slug]) for guide in guides]
+            write_pages(search_pages(plans, sites) + sitemap_pages(plans, sites))
+            write_pages(precache_pages(plans, sites))
+            save_metadata_cache(cache)
+            pending = set()
+            print(f"Rebuilt {', '.join(rendered) if rendered else 'nothing'}")
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Build guide HTML pages from markdown notes.")
+    parser.add_argument(
+        "--guide",
+        action="append",
+        default=[],
+        metavar="SLUG",
+        help="Only build this guide (repeatable, default: every guide with markdown sources)",
+    )
+    parser.add_argument("--no-mirror", action="store_true", help="Skip writing the codex/mirror copy")
+    parser.add_argument(
+        "--no-fingerprint",
+        action="store_true",
+        help="Link plain asset names instead of content-hashed copies",
+    )
+    parser.add_argument(
+        "--no-bundle",
+        action="store_true",
+        help="Link each stylesheet and script separately instead of one minified bundle per guide",
+    )
+    parser.add_argument(
+        "--inline-css",
+        nargs="?",
+        type=int,
+        const=INLINE_CSS_LIMIT,
+        default=0,
+        metavar="BYTES",
+        help=f"Inline the CSS bundle into <head> when it is at most BYTES (default: {INLINE_CSS_LIMIT})",
+    )
+    parser.add_argument(
+        "--minify-html",
+        action="store_true",
+        help="Collapse whitespace between tags in generated pages (pre/code blocks are kept as is)",
+    )
+    parser.add_argument(
+        "--page-budget",
+        type=int,
+        metavar="BYTES",
+        help=f"Fail the build when a generated page exceeds BYTES (default: {PAGE_BUDGET}, 0 disables)",
+    )
+    parser.add_argument(
+        "--no-service-worker",
+        action="store_true",
+        help=f"Do not register {SERVICE_WORKER} or write {PRECACHE_NAME}",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Ignore the chapter metadata cache in .build-cache/"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=1, help="Worker processes for the render stage (default: 1)"
+    )
+    parser.add_argument("--watch", action="store_true", help="Rebuild changed chapters as sources are saved")
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        type=Path,
+        const=PROFILE_FILE,
+        metavar="PATH",
+        help=f"Write per-stage wall/CPU timings as JSON (default path: {PROFILE_FILE})",
+    )
+    parser.add_argument(
+        "--profile-top", type=int, default=10, help="Slowest chapters kept in the profile (default: 10)"
+    )
+    parser.add_argument(
+        "--profile-render",
+        type=Path,
+        metavar="PATH",
+        help="Dump cProfile stats for the render stage to PATH (renders in-process)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=WATCH_INTERVAL,
+        help=f"Watch polling interval in seconds (default: {WATCH_INTERVAL})",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=WATCH_DEBOUNCE,
+        help=f"Quiet period before a watch rebuild in seconds (default: {WATCH_DEBOUNCE})",
+    )
+    args = parser.parse_args(argv)
+
+    guides = discover_guides()
+    if args.guide:
+        guides = [guide for guide in guides if guide.slug in args.guide]
+    if args.page_budget is not None:
+        guides = [replace(guide, page_budget=args.page_budget) for guide in guides]
+    if not guides:
+        raise SystemExit("No guide markdown files found under guides/.")
+    sites = [site for site in available_sites() if not (args.no_mirror and site.name == "mirror")]
+    if args.no_fingerprint:
+        sites = [replace(site, fingerprint=False) for site in sites]
+    if args.no_bundle or args.inline_css:
+        sites = [replace(site, bundle=not args.no_bundle, inline_css=args.inline_css) for site in sites]
+    if args.minify_html:
+        sites = [replace(site, minify_html=True) for site in sites]
+    if args.no_service_worker:
+        sites = [replace(site, service_worker=False) for site in sites]
+
+    if args.watch:
+        watch(guides, sites, args.interval, args.debounce)
+        return
+
+    profile: dict[str, object] | None = None
+    if args.profile:
+        profile = {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "guides": [guide.slug for guide in guides],
+            "sites": [site.name for site in sites],
+            "jobs": args.jobs,
+            "cache": not args.no_cache,
+        }
+
+    started_wall, started_cpu = time.perf_counter(), cpu_seconds()
+    chapter_count, written = build(
+        guides,
+        sites,
+        args.jobs,
+        use_cache=not args.no_cache,
+        profile=profile,
+        render_profile=args.profile_render,
+    )
+    if not chapter_count:
+        raise SystemExit("No chapter markdown files found under guides/.")
+    print(
+        f"Generated {chapter_count} chapter pages across {len(guides)} guide(s) "
+        f"for {', '.join(site.name for site in sites)} ({written} files written)"
+    )
+    for item in bundle_report(guides, sites):
+        saved = int(item["bytes_before"]) - int(item["bytes_after"])
+        inlined = f", {item['inline_css_bytes']} CSS bytes inlined" if item["inline_css_bytes"] else ""
+        print(
+            f"  {item['site']}/{item['guide']} pages: {item['requests_before']} -> {item['requests_after']} "
+            f"asset requests, {item['bytes_before']} -> {item['bytes_after']} bytes ({saved} saved){inlined}"
+        )
+
+    if profile is not None:
+        profile["total"] = {
+            "wall_seconds": round(time.perf_counter() - started_wall, 6),
+            "cpu_seconds": round(cpu_seconds() - started_cpu, 6),
+        }
+        profile["slowest_chapters"] = profile["slowest_chapters"][: max(0, args.profile_top)]
+        args.profile.parent.mkdir(parents=True, exist_ok=True)
+        args.profile.write_text(json.dumps(profile, indent=2), encoding="utf-8")
+
+        for stage, timing in profile["stages"].items():
+            wall_ms = timing["wall_seconds"] * 1000
+            cpu_ms = timing["cpu_seconds"] * 1000
+            print(f"  {stage:<9} wall {wall_ms:9.2f} ms  cpu {cpu_ms:9.2f} ms")
+        for item in profile["slowest_chapters"][:5]:
+            print(f"  slow: {item['guide']}/{item['chapter']} {item['render_seconds'] * 1000:.2f} ms")
+        print(f"  wrote {profile['bytes_written']} bytes in {profile['files_written']} files")
+        print(f"Profile written to {args.profile}")
+        if args.profile_render:
+            print(f"Render stage cProfile stats written to {args.profile_render}")
 
 
 if __name__ == "__main__":
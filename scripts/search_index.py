@@ -0,0 +1,241 @@
+"""
+Build the sharded full-text search index consumed by codex/js/explorer.js.
+
+Documents are split into sections (the text under each h2/h3 heading, with
+the heading's anchor id) and every term maps to postings of (section id,
+term count). Output, per site:
+- search/index.json: tokenizer settings, documents, sections and shard list
+- search/terms-<c>.json: postings for every term starting with <c>
+
+The tokenizer is SQL-aware: identifiers keep their underscores ("to_char"),
+common SQL keyword pairs ("group by", "is null") become single terms, and
+keywords are never dropped as stopwords or stemmed into other words.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from html.parser import HTMLParser
+from pathlib import Path
+
+
+INDEX_VERSION = 2
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9_$#]*")
+HEADING_RE = re.compile(r"^\s*(#{1,6})\s+(.+?)\s*$")
+
+STOPWORDS = frozenset(
+    """
+    a an and are as at be been but by can do does for from had has have he her his how i if in into is it
+    its just me my no not of on or our she so than that the their them then there these they this to too
+    was we were what when which who why will with you your
+    """.split()
+)
+
+SQL_KEYWORDS = frozenset(
+    """
+    add all alter any avg between by case cast char check coalesce column commit constraint count create
+    cross cube current_date current_timestamp date decode default delete desc distinct drop else end
+    except exists fetch first foreign from full grant group grouping having in index inner insert
+    intersect interval into is join key left like limit max merge min minus natural not null nullif
+    number nvl nvl2 offset on or order outer over partition primary references revoke right rollback
+    rollup rownum rowid savepoint select sequence set some substr sum synonym sysdate table then
+    timestamp to_char to_date to_number trunc truncate union unique update using values varchar2 view
+    when where with
+    """.split()
+)
+
+SQL_PHRASES = frozenset(
+    {
+        ("group", "by"),
+        ("order", "by"),
+        ("partition", "by"),
+        ("union", "all"),
+        ("is", "null"),
+        ("not", "null"),
+        ("not", "in"),
+        ("not", "exists"),
+        ("inner", "join"),
+        ("outer", "join"),
+        ("left", "join"),
+        ("right", "join"),
+        ("full", "join"),
+        ("cross", "join"),
+        ("natural", "join"),
+        ("primary", "key"),
+        ("foreign", "key"),
+        ("fetch", "first"),
+        ("create", "table"),
+        ("create", "view"),
+        ("create", "index"),
+        ("create", "sequence"),
+        ("alter", "table"),
+        ("drop", "table"),
+    }
+)
+
+STEM_SUFFIXES = (("ies", "y"), ("sses", "ss"), ("s", ""), ("ing", ""), ("ed", ""))
+
+
+def stem(term: str) -> str:
+    if term in SQL_KEYWORDS or len(term) <= 3 or not term.isalpha():
+        return term
+    for suffix, replacement in STEM_SUFFIXES:
+        if not term.endswith(suffix) or len(term) - len(suffix) < 3:
+            continue
+        if suffix == "s" and term.endswith(("ss", "us", "is")):
+            continue
+        term = term[: -len(suffix)] + replacement
+        if term in SQL_KEYWORDS:
+            return term
+    if term.endswith("e") and len(term) > 4:
+        term = term[:-1]
+    return term
+
+
+def tokenize(text: str) -> list[str]:
+    words = TOKEN_RE.findall(text.lower())
+    terms: list[str] = []
+    for idx, word in enumerate(words):
+        if idx > 0 and (words[idx - 1], word) in SQL_PHRASES:
+            terms.append(f"{words[idx - 1]} {word}")
+        if word in SQL_KEYWORDS:
+            terms.append(word)
+            continue
+        if word in STOPWORDS:
+            continue
+        terms.append(stem(word))
+        if "_" in word:
+            terms.extend(stem(part) for part in word.split("_") if len(part) > 1 and part not in STOPWORDS)
+    return terms
+
+
+def strip_markdown_markers(text: str) -> str:
+    text = re.sub(r"\[([^\]]+)\]\([^)]+\)", r"\1", text)
+    text = re.sub(r"`([^`]+)`", r"\1", text)
+    text = re.sub(r"\*\*(.+?)\*\*", r"\1", text)
+    text = re.sub(r"(?<!\*)\*(?!\s)(.+?)(?<!\s)\*(?!\*)", r"\1", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def plain_text(markdown_text: str) -> str:
+    text = re.sub(r"\[([^\]]+)\]\([^)]+\)", r"\1", markdown_text)
+    return re.sub(r"[`*_>|]", " ", text)
+
+
+def markdown_sections(title: str, markdown_text: str, anchors: list[str]) -> list[tuple[str, str, str]]:
+    # anchors are the h2/h3 ids markdown_to_html assigned, in document order.
+    sections: list[tuple[str, str, list[str]]] = [(title, "", [])]
+    in_code = False
+    for line in markdown_text.splitlines():
+        if line.strip().startswith("```"):
+            in_code = not in_code
+            continue
+        match = None if in_code else HEADING_RE.match(line.lstrip("\ufeff"))
+        if match and len(match.group(1)) in (2, 3):
+            anchor = anchors[len(sections) - 1] if len(sections) - 1 < len(anchors) else ""
+            sections.append((plain_text(match.group(2)).strip(), anchor, []))
+            continue
+        if match and len(match.group(1)) == 1:
+            continue
+        sections[-1][2].append(line)
+    return [(heading, anchor, "\n".join(lines)) for heading, anchor, lines in sections]
+
+
+class SectionParser(HTMLParser):
+    SKIP_TAGS = {"script", "style", "nav", "noscript", "svg"}
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.sections: list[tuple[str, str, list[str]]] = [("", "", [])]
+        self._skip_depth = 0
+        self._in_title = False
+        self._heading: list[str] | None = None
+        self._heading_id = ""
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag in ("h2", "h3") and not self._skip_depth:
+            self._heading = []
+            self._heading_id = dict(attrs).get("id") or ""
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self.SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == "title":
+            self._in_title = False
+        elif tag in ("h2", "h3") and self._heading is not None:
+            self.sections.append((" ".join("".join(self._heading).split()), self._heading_id, []))
+            self._heading = None
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title:
+            self.title += data
+        elif self._skip_depth:
+            return
+        elif self._heading is not None:
+            self._heading.append(data)
+        else:
+            self.sections[-1][2].append(data)
+
+
+def html_sections(page: Path) -> tuple[str, list[tuple[str, str, str]]]:
+    parser = SectionParser()
+    parser.feed(page.read_text(encoding="utf-8", errors="replace"))
+    title = re.sub(r"\s+[-–—|]\s+swf\.wtf\s*$", "", " ".join(parser.title.split())) or page.parent.name
+    sections = [(heading or title, anchor, " ".join(chunks)) for heading, anchor, chunks in parser.sections]
+    return title, sections
+
+
+def shard_key(term: str) -> str:
+    first = term[0]
+    return first if "a" <= first <= "z" else "0"
+
+
+def build_search_index(documents: list[tuple[str, str, list[tuple[str, str, str]]]]) -> dict[str, bytes]:
+    """Return {relative output path: JSON bytes} for (path, title, sections) documents.
+
+    Each section is a (heading, anchor id, text) triple; the anchor may be empty.
+    """
+    docs: list[list[str]] = []
+    sections: list[list[object]] = []
+    postings: dict[str, dict[int, int]] = {}
+
+    for doc_id, (path, title, doc_sections) in enumerate(documents):
+        # Chapter titles (and so the first section heading) are raw markdown.
+        docs.append([path, strip_markdown_markers(title)])
+        for heading, anchor, text in doc_sections:
+            section_id = len(sections)
+            sections.append([doc_id, strip_markdown_markers(heading), anchor])
+            for term in tokenize(f"{heading} {heading} {text}"):
+                counts = postings.setdefault(term, {})
+                counts[section_id] = counts.get(section_id, 0) + 1
+
+    shards: dict[str, dict[str, list[int]]] = {}
+    for term in sorted(postings):
+        flat: list[int] = []
+        for section_id, count in sorted(postings[term].items()):
+            flat.extend((section_id, count))
+        shards.setdefault(shard_key(term), {})[term] = flat
+
+    manifest = {
+        "version": INDEX_VERSION,
+        "stopwords": sorted(STOPWORDS),
+        "keywords": sorted(SQL_KEYWORDS),
+        "phrases": sorted(" ".join(pair) for pair in SQL_PHRASES),
+        "docs": docs,
+        "sections": sections,
+        "shards": sorted(shards),
+    }
+
+    def dump(payload: object) -> bytes:
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    outputs = {"search/index.json": dump(manifest)}
+    for key, terms in shards.items():
+        outputs[f"search/terms-{key}.json"] = dump(terms)
+    return outputs
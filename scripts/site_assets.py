@@ -0,0 +1,238 @@
+"""
+Content-hashed asset fingerprinting and bundling for the guide build.
+
+Generated pages load one minified stylesheet and one minified script per
+guide (assets/bundles/<slug>.<hash>.css/.js). The minifiers are deliberately
+conservative: CSS loses comments and optional whitespace, JS loses comments
+and indentation but keeps its line breaks so automatic semicolon insertion
+still sees the same statements. Without bundles, each asset the pages link
+gets a fingerprinted copy next to it (assets/css/site.css ->
+assets/css/site.<hash>.css); the originals stay in place for the
+hand-maintained pages. The Codex server serves either kind of hashed name
+with an immutable, one-year Cache-Control header.
+
+assets/manifest.json maps every source the generated pages link (a bundle
+counts as assets/bundles/<slug>.css/.js) to its hashed copy, and remembers
+the copy the build before linked where it differs. That copy is kept for
+pages still open or cached from that build; every other hashed copy of an
+asset or bundle is deleted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from pathlib import Path, PurePosixPath
+
+
+HASH_LENGTH = 10
+MANIFEST_NAME = "assets/manifest.json"
+BUNDLE_DIR = "assets/bundles"
+FINGERPRINT_RE = re.compile(rf"\.[0-9a-f]{{{HASH_LENGTH}}}\.[A-Za-z0-9]+$")
+
+
+def fingerprinted_name(rel_path: str, data: bytes) -> str:
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    path = PurePosixPath(rel_path)
+    return str(path.with_name(f"{path.stem}.{digest}{path.suffix}"))
+
+
+def read_manifest(root: Path) -> tuple[dict[str, str], dict[str, str]]:
+    """Return the (linked, previous) mappings of root's manifest; a flat one is all linked."""
+    try:
+        manifest = json.loads((root / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}, {}
+    if not isinstance(manifest, dict):
+        return {}, {}
+    if isinstance(manifest.get("assets"), dict):
+        return manifest["assets"], manifest.get("previous", {})
+    return {key: value for key, value in manifest.items() if isinstance(value, str)}, {}
+
+
+def manifest_bytes(root: Path, linked: dict[str, str]) -> bytes:
+    # A source whose copy changed (or that is no longer linked) remembers the
+    # copy from the manifest on disk; one that did not keeps its older entry.
+    old_linked, old_previous = read_manifest(root)
+    previous: dict[str, str] = {}
+    for source, before in old_linked.items():
+        if before != linked.get(source):
+            previous[source] = before
+        elif source in old_previous:
+            previous[source] = old_previous[source]
+    manifest = {"assets": dict(sorted(linked.items())), "previous": dict(sorted(previous.items()))}
+    return json.dumps(manifest, indent=2).encode("utf-8") + b"\n"
+
+
+def stale_copies(root: Path) -> list[Path]:
+    # Hashed copies of an existing asset, and bundles, that the manifest does
+    # not name; anything else under assets/ is left alone.
+    linked, previous = read_manifest(root)
+    keep = {*linked.values(), *previous.values()}
+    assets_dir = root / "assets"
+    if not assets_dir.is_dir():
+        return []
+    stale: list[Path] = []
+    for path in assets_dir.rglob("*"):
+        if not path.is_file() or not FINGERPRINT_RE.search(path.name):
+            continue
+        rel_path = path.relative_to(root).as_posix()
+        source = FINGERPRINT_RE.sub(path.suffix, rel_path)
+        if rel_path not in keep and (rel_path.startswith(f"{BUNDLE_DIR}/") or (root / source).is_file()):
+            stale.append(path)
+    return sorted(stale)
+
+
+CSS_TOKEN_RE = re.compile(r"\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'|/\*.*?\*/", re.DOTALL)
+CSS_IMPORT_RE = re.compile(r"@import\s*(?:url\((?:\"[^\"]*\"|'[^']*'|[^)]*)\)|\"[^\"]*\"|'[^']*')[^;]*;")
+CSS_URL_RE = re.compile(r"url\(\s*[\"']?(?!data:|https?:|/)[^)\"']")
+JS_REGEX_KEYWORDS = frozenset(
+    "return typeof case do else in of new delete void throw instanceof yield await".split()
+)
+
+
+def minify_css(css: str) -> str:
+    parts: list[str] = []
+    pos = 0
+    for match in CSS_TOKEN_RE.finditer(css):
+        parts.append(_squeeze_css(css[pos : match.start()], parts))
+        if not match.group().startswith("/*"):
+            parts.append(match.group())
+        pos = match.end()
+    parts.append(_squeeze_css(css[pos:], parts))
+    return "".join(parts).strip()
+
+
+def _squeeze_css(text: str, before: list[str]) -> str:
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r"\s*([{};,>])\s*", r"\1", text)
+    text = re.sub(r":\s+", ":", text)
+    if not before or before[-1][-1:] in ("", "{", "}", ";", ",", ">"):
+        text = text.lstrip()
+    return text.replace(";}", "}")
+
+
+def bundle_css(sources: list[str]) -> str:
+    # @import is only valid ahead of every other rule, so imports from all
+    # sources are hoisted (once each) to the top of the bundle.
+    imports: list[str] = []
+    rules: list[str] = []
+    for source in sources:
+        minified = minify_css(source)
+        for statement in CSS_IMPORT_RE.findall(minified):
+            if statement not in imports:
+                imports.append(statement)
+        rules.append(CSS_IMPORT_RE.sub("", minified))
+    return "".join(imports + rules)
+
+
+def inlinable_css(css: str) -> bool:
+    # Relative url()s resolve against the stylesheet, not the page, so such
+    # a bundle has to stay an external file.
+    return "</style" not in css.lower() and not CSS_URL_RE.search(css)
+
+
+def _skip_quoted(source: str, pos: int) -> int:
+    quote = source[pos]
+    pos += 1
+    while pos < len(source):
+        char = source[pos]
+        if char == "\\":
+            pos += 2
+            continue
+        if char == quote or (char == "\n" and quote != "`"):
+            return pos + 1
+        if quote == "`" and source.startswith("${", pos):
+            pos = _skip_braces(source, pos + 2)
+            continue
+        pos += 1
+    return pos
+
+
+def _skip_braces(source: str, pos: int) -> int:
+    depth = 1
+    while pos < len(source) and depth:
+        char = source[pos]
+        if char in "'\"`":
+            pos = _skip_quoted(source, pos)
+            continue
+        depth += {"{": 1, "}": -1}.get(char, 0)
+        pos += 1
+    return pos
+
+
+def _skip_regex(source: str, pos: int) -> int:
+    in_class = False
+    pos += 1
+    while pos < len(source) and source[pos] != "\n":
+        char = source[pos]
+        if char == "\\":
+            pos += 2
+            continue
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            pos += 1
+            while pos < len(source) and (source[pos].isalpha()):
+                pos += 1
+            return pos
+        pos += 1
+    return pos
+
+
+def _regex_allowed(code: str) -> bool:
+    code = code.rstrip()
+    if not code or code[-1] in "(,=:[!&|?{};+-*%<>~^":
+        return True
+    word = re.search(r"[A-Za-z_$][\w$]*$", code)
+    return bool(word) and word.group() in JS_REGEX_KEYWORDS
+
+
+def _squeeze_js(code: str) -> str:
+    code = re.sub(r"[ \t]*\n\s*", "\n", code)
+    code = re.sub(r"[ \t]+", " ", code)
+    # + - / and . keep their spacing: "a + +b", "a / b" and "1 .x" need it.
+    return re.sub(r" ?([{}()\[\];,:=<>?!&|*%^~]) ?", r"\1", code)
+
+
+def minify_js(source: str) -> str:
+    parts: list[str] = []
+    code: list[str] = []
+    pos = 0
+    while pos < len(source):
+        char = source[pos]
+        if char in "'\"`" or (char == "/" and not source.startswith(("//", "/*"), pos)
+                               and _regex_allowed("".join(code) or "".join(parts[-1:]))):
+            end = _skip_quoted(source, pos) if char != "/" else _skip_regex(source, pos)
+            parts.append(_squeeze_js("".join(code)))
+            parts.append(source[pos:end])
+            code = []
+            pos = end
+            continue
+        if source.startswith("//", pos):
+            end = source.find("\n", pos)
+            pos = len(source) if end == -1 else end
+            continue
+        if source.startswith("/*", pos):
+            end = source.find("*/", pos + 2)
+            pos = len(source) if end == -1 else end + 2
+            code.append(" ")
+            continue
+        code.append(char)
+        pos += 1
+    parts.append(_squeeze_js("".join(code)))
+    return "".join(parts).strip()
+
+
+def bundle_js(sources: list[str]) -> str:
+    # Each source ends its own statements; the separator keeps a source that
+    # relies on ASI at EOF from running into the next one.
+    return ";\n".join(minify_js(source) for source in sources if source.strip()) + "\n"
+
+
+def bundle_name(name: str, suffix: str, data: bytes, fingerprint: bool = True) -> str:
+    rel_path = f"{BUNDLE_DIR}/{name}{suffix}"
+    return fingerprinted_name(rel_path, data) if fingerprint else rel_path
@@ -0,0 +1,110 @@
+"""
+Incremental sitemap.xml and sitemap.json generation for the guide build.
+
+The build writes two files, generated from the root site, to the root of
+every site:
+- sitemap.xml: the crawler-facing sitemap
+- sitemap.json: a compact page index ({"pages": [[path, lastmod, hash]]})
+  read by codex/js/explorer.js instead of parsing the XML
+
+Pages generated from markdown are added and removed by the build; every
+other entry is hand-maintained in sitemap.xml and kept while its file exists.
+An entry's <lastmod> only moves when the content hash of its source changes
+(the markdown for generated pages, the HTML file for hand-maintained ones),
+so rebuilding unchanged notes leaves both files byte-identical. Entries stay in
+the order sitemap.xml lists them; pages that are new to it are appended.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+
+SITE_URL = "https://swf.wtf"
+SITEMAP_NAME = "sitemap.xml"
+PAGE_INDEX_NAME = "sitemap.json"
+PAGE_INDEX_VERSION = 1
+HASH_LENGTH = 12
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def page_file(root: Path, path: str) -> Path:
+    # "/guides/" is served from guides/index.html.
+    rel_path = path.lstrip("/")
+    return root / (rel_path + "index.html" if not rel_path or rel_path.endswith("/") else rel_path)
+
+
+def read_sitemap(root: Path) -> dict[str, str]:
+    """Return {path: lastmod} for the entries of the site's current sitemap.xml."""
+    try:
+        tree = ET.parse(root / SITEMAP_NAME)
+    except (FileNotFoundError, ET.ParseError):
+        return {}
+    entries: dict[str, str] = {}
+    for url in tree.getroot().iter(f"{{{SITEMAP_NS}}}url"):
+        loc = (url.findtext(f"{{{SITEMAP_NS}}}loc") or "").strip()
+        if loc.startswith(SITE_URL):
+            entries[loc[len(SITE_URL) :] or "/"] = (url.findtext(f"{{{SITEMAP_NS}}}lastmod") or "").strip()
+    return entries
+
+
+def read_page_index(root: Path) -> dict[str, tuple[str, str]]:
+    try:
+        payload = json.loads((root / PAGE_INDEX_NAME).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if payload.get("version") != PAGE_INDEX_VERSION:
+        return {}
+    return {path: (lastmod, digest) for path, lastmod, digest in payload.get("pages", [])}
+
+
+def build_sitemap(
+    root: Path, generated: dict[str, str], managed_prefixes: list[str], today: str
+) -> dict[str, bytes]:
+    """Return {relative output path: bytes} for the site's sitemap.xml and sitemap.json.
+
+    generated maps the path of every page built from markdown to the hash of
+    its source. Existing entries under managed_prefixes that are not in
+    generated belong to deleted chapters and are dropped.
+    """
+    sitemap = read_sitemap(root)
+    previous = read_page_index(root)
+
+    hashes = dict(generated)
+    for path in sitemap.keys() | previous.keys():
+        if path in hashes or any(path.startswith(prefix) for prefix in managed_prefixes):
+            continue
+        source = page_file(root, path)
+        if source.is_file():
+            hashes[path] = content_hash(source.read_bytes())
+
+    pages: list[tuple[str, str, str]] = []
+    for path in dict.fromkeys([*sitemap, *previous, *generated]):
+        digest = hashes.get(path)
+        if digest is None:
+            continue
+        lastmod, old_digest = previous.get(path, (sitemap.get(path, ""), ""))
+        if not lastmod or (old_digest and old_digest != digest):
+            lastmod = today
+        pages.append((path, lastmod, digest))
+
+    xml_lines = ['<?xml version="1.0" encoding="utf-8"?>', f'<urlset xmlns="{SITEMAP_NS}">']
+    for path, lastmod, _ in pages:
+        loc = escape(SITE_URL + path)
+        xml_lines.extend(("  <url>", f"    <loc>{loc}</loc>", f"    <lastmod>{lastmod}</lastmod>"))
+        xml_lines.append("  </url>")
+    xml_lines.append("</urlset>")
+
+    index = {"version": PAGE_INDEX_VERSION, "base": SITE_URL, "pages": [list(page) for page in pages]}
+    return {
+        SITEMAP_NAME: ("\n".join(xml_lines) + "\n").encode("utf-8"),
+        PAGE_INDEX_NAME: json.dumps(index, separators=(",", ":")).encode("utf-8"),
+    }
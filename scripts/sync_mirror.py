@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Incrementally sync the root site into codex/mirror.
+
+Every root file git would publish (tracked, or untracked but not ignored by
+.gitignore) outside the excluded paths is planned into the mirror:
+- HTML pages get their root-absolute URLs ("/assets/...") rewritten relative
+  to the page's depth and link the mirror's codex-mirror.css/.js
+- everything else is copied byte for byte, or hardlinked with --hardlink
+
+A file is only written when the bytes it should have differ from what the
+mirror holds. Source and mirror stat results from the last sync are kept in
+.build-cache/mirror-sync.json, so unchanged pairs are skipped without reading
+either file. Mirror files with no root counterpart are deleted, except for the
+mirror's own files and the outputs build_sql_guide.py writes there (markdown
+guide pages, search index, asset bundles and fingerprints, sitemap.xml,
+sitemap.json and precache-manifest.json).
+
+    python scripts/sync_mirror.py --dry-run
+    python scripts/sync_mirror.py && python scripts/build_sql_guide.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import subprocess
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import build_sql_guide as builder
+from site_assets import BUNDLE_DIR, FINGERPRINT_RE, MANIFEST_NAME
+from sitemap import PAGE_INDEX_NAME, SITEMAP_NAME
+
+
+STATE_FILE = builder.ROOT / ".build-cache" / "mirror-sync.json"
+STATE_VERSION = 1
+
+# Patterns without a slash match any path component, others the whole path.
+EXCLUDE = (".*", "__pycache__", "codex/*", "scripts/*", "tests/*")
+MIRROR_CSS = "assets/css/codex-mirror.css"
+MIRROR_JS = "assets/js/codex-mirror.js"
+ABSOLUTE_URL_RE = re.compile(r"""(\b(?:href|src|action)=["'])/(?!/)([^"']*)""")
+
+
+def excluded(rel_path: str, patterns: tuple[str, ...]) -> bool:
+    parts = rel_path.split("/")
+    for pattern in patterns:
+        if "/" in pattern and fnmatch.fnmatch(rel_path, pattern):
+            return True
+        if "/" not in pattern and any(fnmatch.fnmatch(part, pattern) for part in parts):
+            return True
+    return False
+
+
+def builder_owned(rel_path: str, guide_prefixes: tuple[str, ...]) -> bool:
+    if rel_path in (MANIFEST_NAME, PAGE_INDEX_NAME, SITEMAP_NAME, builder.PRECACHE_NAME):
+        return True
+    if rel_path.startswith((f"{BUNDLE_DIR}/", "search/")):
+        return True
+    if rel_path.startswith("assets/") and FINGERPRINT_RE.search(rel_path):
+        return True
+    return rel_path.startswith(guide_prefixes)
+
+
+def site_files(root: Path, skip: Callable[[str], bool]) -> dict[str, Path]:
+    files: dict[str, Path] = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = Path(dirpath).relative_to(root).as_posix()
+        rel_dir = "" if rel_dir == "." else f"{rel_dir}/"
+        dirnames[:] = sorted(name for name in dirnames if not skip(f"{rel_dir}{name}/"))
+        for name in filenames:
+            rel_path = f"{rel_dir}{name}"
+            if not skip(rel_path):
+                files[rel_path] = Path(dirpath) / name
+    return files
+
+
+def git_files(root: Path, skip: Callable[[str], bool]) -> dict[str, Path] | None:
+    """Like site_files, but only the files git tracks or would add; None outside a git checkout."""
+    try:
+        listed = subprocess.run(
+            ["git", "ls-files", "--cached", "--others", "--exclude-standard", "-z"],
+            cwd=root,
+            capture_output=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    files: dict[str, Path] = {}
+    for rel_path in sorted(set(os.fsdecode(name) for name in listed.split(b"\0") if name)):
+        # Tracked files deleted from the working tree are still listed.
+        if not skip(rel_path) and (root / rel_path).is_file():
+            files[rel_path] = root / rel_path
+    return files
+
+
+def mirror_html(rel_path: str, page: str) -> str:
+    # Same URL scheme as the generated mirror pages: relative to the page, so
+    # the mirror works when served from any directory.
+    prefix = "../" * rel_path.count("/")
+
+    page = ABSOLUTE_URL_RE.sub(lambda match: match.group(1) + prefix + match.group(2), page)
+    if MIRROR_CSS not in page and "</head>" in page:
+        page = page.replace("</head>", f'<link rel="stylesheet" href="{prefix}{MIRROR_CSS}">\n</head>', 1)
+    if MIRROR_JS not in page and "</body>" in page:
+        page = page.replace("</body>", f'<script defer src="{prefix}{MIRROR_JS}"></script>\n</body>', 1)
+    return page
+
+
+def load_state() -> dict[str, dict[str, object]]:
+    try:
+        payload = json.loads(STATE_FILE.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if not isinstance(payload, dict) or payload.get("version") != STATE_VERSION:
+        return {}
+    entries = payload.get("files")
+    return entries if isinstance(entries, dict) else {}
+
+
+def save_state(state: dict[str, dict[str, object]]) -> None:
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"version": STATE_VERSION, "files": state}
+    STATE_FILE.write_text(json.dumps(payload, indent=1, sort_keys=True), encoding="utf-8")
+
+
+def stamp(path: Path) -> list[int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def digest(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def place(target: Path, data: bytes | None, source: Path) -> None:
+    # Written through a temporary name so a reader never sees half a file;
+    # data is None for a hardlink to the source.
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp = target.with_name(f".{target.name}.sync")
+    temp.unlink(missing_ok=True)
+    if data is None:
+        try:
+            os.link(source, temp)
+        except OSError:
+            data = source.read_bytes()
+    if data is not None:
+        temp.write_bytes(data)
+    os.replace(temp, target)
+
+
+def sync(
+    root: Path = builder.ROOT,
+    mirror: Path = builder.MIRROR_DIR,
+    exclude: tuple[str, ...] = EXCLUDE,
+    hardlink: bool = False,
+    delete: bool = True,
+    dry_run: bool = False,
+) -> dict[str, int]:
+    """Bring mirror up to date with root; returns per-action file counts."""
+    guide_prefixes = tuple(f"guides/{guide.slug}/" for guide in builder.discover_guides())
+
+    def skip(rel_path: str) -> bool:
+        return excluded(rel_path, exclude) or builder_owned(rel_path, guide_prefixes)
+
+    sources = git_files(root, skip)
+    if sources is None:
+        print(f"{root} is not a git checkout; syncing every file outside the excluded paths")
+        sources = site_files(root, skip)
+    targets = site_files(mirror, lambda rel_path: builder_owned(rel_path, guide_prefixes))
+    state = load_state()
+    counts = {"unchanged": 0, "copied": 0, "rewritten": 0, "linked": 0, "deleted": 0, "bytes": 0}
+
+    for rel_path, source in sources.items():
+        target = mirror / rel_path
+        rewrite = source.suffix == ".html"
+        source_stamp, target_stamp = stamp(source), stamp(target)
+        entry = state.get(rel_path, {})
+        link = hardlink and not rewrite
+        if not link and [entry.get("source"), entry.get("target")] == [source_stamp, target_stamp]:
+            counts["unchanged"] += 1
+            continue
+        if not rewrite and target_stamp and os.path.samefile(source, target):
+            state[rel_path] = {"source": source_stamp, "target": target_stamp, "sha1": entry.get("sha1", "")}
+            counts["unchanged"] += 1
+            continue
+
+        data = source.read_bytes()
+        if rewrite:
+            data = mirror_html(rel_path, data.decode("utf-8")).encode("utf-8")
+        data_digest = digest(data)
+        # The mirror side is only read when it changed since the last sync and
+        # its size does not already rule out a match.
+        target_digest = None
+        if target_stamp and entry.get("target") == target_stamp:
+            target_digest = entry.get("sha1")
+        elif target_stamp and target_stamp[1] == len(data):
+            target_digest = digest(target.read_bytes())
+        if target_digest == data_digest and not link:
+            state[rel_path] = {"source": source_stamp, "target": target_stamp, "sha1": data_digest}
+            counts["unchanged"] += 1
+            continue
+
+        action = "rewritten" if rewrite else "linked" if link else "copied"
+        counts[action] += 1
+        counts["bytes"] += 0 if action == "linked" else len(data)
+        print(f"{action:>9} {rel_path}")
+        if dry_run:
+            continue
+        place(target, None if action == "linked" else data, source)
+        state[rel_path] = {"source": stamp(source), "target": stamp(target), "sha1": data_digest}
+
+    if delete:
+        for rel_path in sorted(targets.keys() - sources.keys()):
+            if rel_path in (MIRROR_CSS, MIRROR_JS) or excluded(rel_path, exclude):
+                continue
+            counts["deleted"] += 1
+            print(f"{'deleted':>9} {rel_path}")
+            state.pop(rel_path, None)
+            if not dry_run:
+                (mirror / rel_path).unlink()
+                for parent in (mirror / rel_path).parents:
+                    if parent == mirror or any(parent.iterdir()):
+                        break
+                    parent.rmdir()
+
+    if not dry_run:
+        save_state({rel_path: entry for rel_path, entry in state.items() if rel_path in sources})
+    return counts
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Incrementally sync the root site into codex/mirror.")
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help=f"Extra path or name glob to leave out of the mirror (always excluded: {', '.join(EXCLUDE)})",
+    )
+    parser.add_argument(
+        "--hardlink",
+        action="store_true",
+        help="Hardlink non-HTML files into the mirror instead of copying them",
+    )
+    parser.add_argument(
+        "--no-delete", action="store_true", help="Keep mirror files that have no root counterpart"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Print what would change without writing")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    counts = sync(
+        exclude=EXCLUDE + tuple(args.exclude),
+        hardlink=args.hardlink,
+        delete=not args.no_delete,
+        dry_run=args.dry_run,
+    )
+    elapsed = time.perf_counter() - started
+    print(
+        f"{'Would sync' if args.dry_run else 'Synced'} codex/mirror in {elapsed:.2f}s: "
+        f"{counts['copied']} copied, {counts['rewritten']} rewritten, {counts['linked']} linked, "
+        f"{counts['deleted']} deleted, {counts['unchanged']} unchanged ({counts['bytes']} bytes written)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+// Precaching service worker for the generated guide pages.
+//
+// precache-manifest.json (written next to this file by
+// scripts/build_sql_guide.py) maps every guide chapter, guide index and the
+// assets they load to a content hash. Listed URLs are served cache-first, so
+// prev/next chapter navigation never waits on the network. The manifest is
+// re-fetched in the background at most once a minute, and only URLs whose
+// hash changed are downloaded again.
+
+const CACHE_NAME = 'swf-precache-v1';
+const MANIFEST_URL = new URL('precache-manifest.json', self.registration.scope).href;
+const REVALIDATE_MS = 60 * 1000;
+
+// { absolute url: hash } of what is actually in the cache.
+let cached = null;
+let lastCheck = 0;
+let pending = null;
+
+function absoluteUrls(entries) {
+  const urls = {};
+  Object.entries(entries || {}).forEach(([path, hash]) => {
+    urls[new URL(path, self.registration.scope).href] = hash;
+  });
+  return urls;
+}
+
+function cacheKey(requestUrl) {
+  const url = new URL(requestUrl);
+  url.hash = '';
+  if (url.pathname.endsWith('/')) url.pathname += 'index.html';
+  return url.href;
+}
+
+async function loadCached(cache) {
+  if (!cached) {
+    const stored = await cache.match(MANIFEST_URL);
+    cached = stored ? (await stored.json()).urls || {} : {};
+  }
+  return cached;
+}
+
+async function revalidate() {
+  lastCheck = Date.now();
+  const response = await fetch(MANIFEST_URL, { cache: 'no-cache' });
+  if (!response.ok) return;
+
+  const wanted = absoluteUrls((await response.json()).urls);
+  const cache = await caches.open(CACHE_NAME);
+  const current = { ...(await loadCached(cache)) };
+
+  const changed = Object.keys(wanted).filter((url) => current[url] !== wanted[url]);
+  await Promise.all(changed.map(async (url) => {
+    try {
+      const fresh = await fetch(url, { cache: 'no-cache' });
+      if (!fresh.ok) return;
+      await cache.put(url, fresh);
+      current[url] = wanted[url];
+    } catch {
+      // Left out of the stored hashes, so the next revalidation retries it.
+    }
+  }));
+
+  const removed = Object.keys(current).filter((url) => !(url in wanted));
+  await Promise.all(removed.map((url) => cache.delete(url)));
+  removed.forEach((url) => delete current[url]);
+
+  cached = current;
+  await cache.put(MANIFEST_URL, new Response(JSON.stringify({ urls: current }), {
+    headers: { 'Content-Type': 'application/json' }
+  }));
+}
+
+function revalidateSoon() {
+  if (!pending && Date.now() - lastCheck >= REVALIDATE_MS) {
+    pending = revalidate().catch(() => {}).finally(() => {
+      pending = null;
+    });
+  }
+  return pending || Promise.resolve();
+}
+
+async function respond(event, key) {
+  const cache = await caches.open(CACHE_NAME);
+  const urls = await loadCached(cache);
+  event.waitUntil(revalidateSoon());
+  if (key in urls) {
+    const hit = await cache.match(key);
+    if (hit) return hit;
+  }
+  return fetch(event.request);
+}
+
+self.addEventListener('install', (event) => {
+  event.waitUntil(revalidateSoon().then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', (event) => {
+  event.waitUntil(
+    caches.keys()
+      .then((names) => Promise.all(
+        names
+          .filter((name) => name.startsWith('swf-precache-') && name !== CACHE_NAME)
+          .map((name) => caches.delete(name))
+      ))
+      .then(() => self.clients.claim())
+  );
+});
+
+self.addEventListener('fetch', (event) => {
+  const { request } = event;
+  if (request.method !== 'GET' || new URL(request.url).origin !== self.location.origin) return;
+
+  const key = cacheKey(request.url);
+  // Once the stored hashes are in memory, unlisted URLs go straight to the
+  // network without a detour through the worker.
+  if (cached && !(key in cached)) {
+    event.waitUntil(revalidateSoon());
+    return;
+  }
+  event.respondWith(respond(event, key));
+});
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+
+ROOT = Path(__file__).resolve().parents[1]
+# server.py and the build scripts import their siblings by bare name.
+for directory in (ROOT / "codex", ROOT / "scripts"):
+    if str(directory) not in sys.path:
+        sys.path.insert(0, str(directory))
+
+
+@pytest.fixture
+def visitor_log(tmp_path, monkeypatch):
+    import server
+
+    monkeypatch.setattr(server, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(server, "DATA_FILE", tmp_path / "visitors.jsonl")
+    return server.DATA_FILE
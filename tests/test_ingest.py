@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import http.client
+import socket
+import threading
+
+import server
+
+
+def test_slow_body_does_not_hold_a_pending_slot(visitor_log, monkeypatch):
+    monkeypatch.setattr(server.CodexHandler, "timeout", 0.5)
+    monkeypatch.setattr(server, "STORE", server.VisitorStore("none"))
+    monkeypatch.setattr(server, "INGEST", server.IngestLimits(rate=0, max_pending=1, ip_rate=0))
+    httpd = server.ThreadingHTTPServer(("127.0.0.1", 0), server.CodexHandler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    port = httpd.server_address[1]
+    try:
+        slow = socket.create_connection(("127.0.0.1", port))
+        slow.sendall(b"POST /api/visitors HTTP/1.1\r\nHost: x\r\nContent-Length: 20\r\n\r\n{")
+
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        connection.request("POST", "/api/visitors", b'{"page": "/"}', {"Content-Type": "application/json"})
+        assert connection.getresponse().status == 201
+        connection.close()
+
+        slow.settimeout(5)
+        assert slow.recv(64).startswith(b"HTTP/1.0 408")
+        slow.close()
+        assert server.INGEST.counters == {"accepted": 1, "rate_limited": 0, "overloaded": 0}
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
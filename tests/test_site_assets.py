@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import os
+
+from site_assets import MANIFEST_NAME, manifest_bytes, stale_copies
+
+
+def build(root, linked: dict[str, str]) -> list[str]:
+    (root / MANIFEST_NAME).write_bytes(manifest_bytes(root, linked))
+    stale = [path.relative_to(root).as_posix() for path in stale_copies(root)]
+    for rel_path in stale:
+        (root / rel_path).unlink()
+    return stale
+
+
+def test_manifest_history_picks_the_previous_generation(tmp_path):
+    (tmp_path / "assets" / "bundles").mkdir(parents=True)
+    (tmp_path / "assets" / "site.css").write_text("source")
+    copies = ["site.aaaaaaaaaa.css", "site.bbbbbbbbbb.css", "site.cccccccccc.css", "bundles/g.1111111111.css"]
+    for name in copies:
+        path = tmp_path / "assets" / name
+        path.write_text(name)
+        # Every copy gets the same mtime, as after a git checkout.
+        os.utime(path, ns=(0, 0))
+
+    assert build(tmp_path, {"assets/site.css": "assets/site.aaaaaaaaaa.css"}) == [
+        "assets/bundles/g.1111111111.css",
+        "assets/site.bbbbbbbbbb.css",
+        "assets/site.cccccccccc.css",
+    ]
+    (tmp_path / "assets" / "site.cccccccccc.css").write_text("new")
+    linked = {"assets/site.css": "assets/site.cccccccccc.css"}
+    assert build(tmp_path, linked) == []
+    # Unchanged: the copy the build before last linked stays the previous generation.
+    assert build(tmp_path, linked) == []
+    # No longer linked: the last copy is kept for one more build, then deleted.
+    assert build(tmp_path, {}) == ["assets/site.aaaaaaaaaa.css"]
+    assert build(tmp_path, {}) == ["assets/site.cccccccccc.css"]
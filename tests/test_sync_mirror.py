@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import pytest
+
+import build_sql_guide as builder
+import sync_mirror
+
+
+def test_mirror_matches_published_files():
+    guide_prefixes = tuple(f"guides/{guide.slug}/" for guide in builder.discover_guides())
+
+    def skip(rel_path: str) -> bool:
+        return sync_mirror.excluded(rel_path, sync_mirror.EXCLUDE) or sync_mirror.builder_owned(
+            rel_path, guide_prefixes
+        )
+
+    published = sync_mirror.git_files(builder.ROOT, skip)
+    if published is None:
+        pytest.skip("not a git checkout")
+    mirrored = sync_mirror.site_files(
+        builder.MIRROR_DIR, lambda rel_path: sync_mirror.builder_owned(rel_path, guide_prefixes)
+    )
+    own = {sync_mirror.MIRROR_CSS, sync_mirror.MIRROR_JS}
+    assert sorted(mirrored.keys() - own) == sorted(published)
+
+    counts = sync_mirror.sync(dry_run=True)
+    assert counts["copied"] == counts["rewritten"] == counts["deleted"] == 0
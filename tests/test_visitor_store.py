@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+
+import server
+
+
+def post(store: server.VisitorStore, **fields) -> tuple[str, int]:
+    now = datetime.now(timezone.utc).isoformat()
+    return store.append({"page": "/", "fingerprint": "f", "serverRecordedAt": now, **fields})
+
+
+def listed(store: server.VisitorStore, limit: int = 50) -> dict:
+    return json.loads(store.response(limit)[1])
+
+
+def test_duplicate_client_id_on_cold_store(visitor_log):
+    store = server.VisitorStore("none")
+    first, _ = post(store, id="abc")
+    second, stored = post(store, id="abc")
+
+    assert first != second and "abc" not in (first, second)
+    body = listed(store)
+    assert stored == body["count"] == len(body["records"]) == 2
+
+    assert store.delete(first) == 1
+    body = listed(store)
+    assert body["count"] == len(body["records"]) == 1
+
+    restarted = listed(server.VisitorStore("none"))
+    assert restarted["count"] == 1
+    assert [record["id"] for record in restarted["records"]] == [second]
+
+
+def test_cold_read_uses_summary_and_catches_up(visitor_log):
+    store = server.VisitorStore("none")
+    ids = [post(store, fingerprint=f"f{index % 3}")[0] for index in range(6)]
+    store.delete(ids[0])
+    store.save_summary()
+    assert json.loads(server.summary_path().read_text())["size"] == visitor_log.stat().st_size
+
+    # Appended after the summary was written: only these lines are scanned.
+    post(server.VisitorStore("none"), fingerprint="f0")
+    body = listed(server.VisitorStore("none"))
+    assert body["count"] == len(body["records"]) == 6
+    assert {record["fingerprint"] for record in body["records"]} == {"f0", "f1", "f2"}
+
+    # A log rewritten behind the summary's back is rescanned in full.
+    lines = visitor_log.read_bytes().splitlines(keepends=True)
+    visitor_log.write_bytes(b"".join(line for line in lines if b'"deleted"' not in line))
+    body = listed(server.VisitorStore("none"))
+    assert body["count"] == len(body["records"]) == 7